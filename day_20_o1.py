@@ -1,4 +1,8 @@
 from collections import deque
+from multiprocessing import Pool, shared_memory
+import os
+
+import numpy as np
 
 
 def read_data(filename: str = "20.txt"):
@@ -55,120 +59,323 @@ def bfs_on_track(grid, start):
     return dist
 
 
-def part1(data) -> int:
+def cell_cost(ch) -> int:
     """
-    Part 1: Cheating for up to 2 picoseconds.
-    Returns how many cheats would save at least 100 picoseconds.
+    Traversal cost of a track cell on a weighted track: digits '0'..'9' cost
+    their value (so '0' cells are free), plain track ('.', 'S', 'E') costs 1.
+    """
+    return int(ch) if "0" <= ch <= "9" else 1
+
+
+def dial_on_track(grid, start, reverse=False):
+    """
+    Dial's bucket-queue shortest path over a weighted track, where entering
+    a cell costs cell_cost() of that cell. Same output as bfs_on_track():
+    a 2D list 'dist' with None for unreachable cells.
+
+    With reverse=True the distances are *to* 'start' instead of from it
+    (each move pays the cost of the cell being left), which is what the
+    distE field needs on a weighted track.
+
+    The ring has B = max_w + 1 buckets indexed by dist % B, max_w being the
+    largest cell cost on the grid: a pushed entry is always less than one
+    ring ahead of the cursor. Zero-cost cells work too, as their pushes land
+    in the bucket currently being drained and are popped in the same pass.
     """
-    grid, (sr, sc), (er, ec) = data
     R = len(grid)
     C = len(grid[0])
+    (sr, sc) = start
 
-    distS = bfs_on_track(grid, (sr, sc))  # cost from S to each cell
-    distE = bfs_on_track(grid, (er, ec))  # cost from E to each cell
-    dist_normal = distS[er][ec]
-    if dist_normal is None:
-        return 0  # No path at all => no cheats
+    max_w = max(
+        (cell_cost(ch) for row in grid for ch in row if ch != "#"), default=1
+    )
+    B = max_w + 1
 
-    # Gather all track positions
-    track_positions = [(r, c) for r in range(R) for c in range(C) if grid[r][c] != "#"]
+    dist = [[None] * C for _ in range(R)]
+    dist[sr][sc] = 0
 
-    big_savers = set()
+    buckets = [[] for _ in range(B)]
+    buckets[0].append((sr, sc))
+    pending = 1
+    d = 0
+
+    while pending:
+        bucket = buckets[d % B]
+        while bucket:
+            r, c = bucket.pop()
+            pending -= 1
+            if dist[r][c] != d:
+                continue  # stale entry, improved after it was pushed
+            leave_cost = cell_cost(grid[r][c])
+            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < R and 0 <= nc < C and grid[nr][nc] != "#":
+                    nd = d + (leave_cost if reverse else cell_cost(grid[nr][nc]))
+                    if dist[nr][nc] is None or nd < dist[nr][nc]:
+                        dist[nr][nc] = nd
+                        buckets[nd % B].append((nr, nc))
+                        pending += 1
+        d += 1
 
-    # For each track cell T, if reachable from S, do BFS ignoring walls for up to 2 steps
-    for r, c in track_positions:
-        if distS[r][c] is None:
-            continue
+    return dist
 
-        base_cost_to_T = distS[r][c]
 
-        # BFS ignoring walls up to distance=2
-        visited_ignore_walls = [[None] * C for _ in range(R)]
-        visited_ignore_walls[r][c] = 0
-        queue = deque([(r, c)])
+def _distance_fields(data, weighted):
+    """
+    Returns (distS, distE, dist_normal) for the track in 'data', using BFS on
+    a unit track or Dial's algorithm on a weighted one.
+    """
+    grid, start, (er, ec) = data
+    if weighted:
+        distS = dial_on_track(grid, start)
+        distE = dial_on_track(grid, (er, ec), reverse=True)
+    else:
+        distS = bfs_on_track(grid, start)
+        distE = bfs_on_track(grid, (er, ec))
+    return distS, distE, distS[er][ec]
 
-        while queue:
-            rr, cc = queue.popleft()
-            steps_so_far = visited_ignore_walls[rr][cc]
-            if steps_so_far == 2:
-                continue  # Can't go further than 2 steps ignoring walls
 
-            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nr, nc = rr + dr, cc + dc
-                if 0 <= nr < R and 0 <= nc < C:
-                    if visited_ignore_walls[nr][nc] is None:
-                        visited_ignore_walls[nr][nc] = steps_so_far + 1
-                        queue.append((nr, nc))
+def _cheat_offsets(max_cheat):
+    """
+    Returns every (dr, dc, steps) displacement a cheat of at most 'max_cheat'
+    picoseconds can cover, with 1 <= steps <= max_cheat (Manhattan distance).
+    Sorted by (dr, dc) so that enumeration order is deterministic.
+    """
+    offsets = []
+    for dr in range(-max_cheat, max_cheat + 1):
+        span = max_cheat - abs(dr)
+        for dc in range(-span, span + 1):
+            steps = abs(dr) + abs(dc)
+            if steps >= 1:
+                offsets.append((dr, dc, steps))
+    return offsets
 
-        # Now, check all track positions that are reachable in up to 2 ignoring-walls steps
-        for rr, cc in track_positions:
-            steps = visited_ignore_walls[rr][cc]
-            if steps is not None and 1 <= steps <= 2 and distE[rr][cc] is not None:
-                cheat_cost = base_cost_to_T + steps + distE[rr][cc]
-                time_saved = dist_normal - cheat_cost
-                if time_saved >= 100:
-                    big_savers.add(((r, c), (rr, cc)))
 
-    return len(big_savers)
+def _check_min_saving(min_saving):
+    """A cheat has to save time: savings of 0 or less are not cheats."""
+    if min_saving < 1:
+        raise ValueError("min_saving must be at least 1.")
 
 
-def part2(data) -> int:
+def iter_cheats(data, max_cheat, min_saving=1, weighted=False):
     """
-    Part 2: Cheating for up to 20 picoseconds.
-    Returns how many cheats would save at least 100 picoseconds.
+    Streams every cheat lasting at most 'max_cheat' picoseconds that saves
+    at least 'min_saving' picoseconds, as (start, end, saved) records where
+    start and end are (row, col) track cells.
+
+    Cheats are yielded in row-major order of their start cell, then in
+    (dr, dc) order of their displacement. No cheat is yielded twice, so no
+    dedup set is kept: memory is the two distance grids plus the offsets.
+
+    With weighted=True, track digits are traversal costs (see cell_cost());
+    the cheat itself still costs 1 per picosecond of phasing.
     """
-    grid, (sr, sc), (er, ec) = data
+    _check_min_saving(min_saving)
+    grid = data[0]
     R = len(grid)
     C = len(grid[0])
 
-    distS = bfs_on_track(grid, (sr, sc))  # cost from S to each cell
-    distE = bfs_on_track(grid, (er, ec))  # cost from E to each cell
-    dist_normal = distS[er][ec]
+    # cost from S to each cell, and from each cell to E
+    distS, distE, dist_normal = _distance_fields(data, weighted)
     if dist_normal is None:
-        return 0  # No path at all => no cheats
+        return  # No path at all => no cheats
+
+    offsets = _cheat_offsets(max_cheat)
+
+    for r in range(R):
+        for c in range(C):
+            base_cost_to_T = distS[r][c]
+            if base_cost_to_T is None:
+                continue
+            # A cheat from (r,c) can save at most this much before adding distE
+            budget = dist_normal - base_cost_to_T - min_saving
+            for dr, dc, steps in offsets:
+                rr, cc = r + dr, c + dc
+                if 0 <= rr < R and 0 <= cc < C:
+                    remaining = distE[rr][cc]
+                    if remaining is not None and steps + remaining <= budget:
+                        saved = dist_normal - (base_cost_to_T + steps + remaining)
+                        yield (r, c), (rr, cc), saved
+
+
+def count_cheats(data, max_cheat, min_saving=1, weighted=False) -> int:
+    """
+    Count-only version of iter_cheats(): returns how many cheats lasting at
+    most 'max_cheat' picoseconds save at least 'min_saving' picoseconds,
+    without ever building a (start, end) pair.
+    """
+    _check_min_saving(min_saving)
+    grid = data[0]
+    R = len(grid)
+    C = len(grid[0])
 
-    # Gather all track positions
-    track_positions = [(r, c) for r in range(R) for c in range(C) if grid[r][c] != "#"]
+    distS, distE, dist_normal = _distance_fields(data, weighted)
+    if dist_normal is None:
+        return 0
 
-    big_savers = set()
+    offsets = _cheat_offsets(max_cheat)
 
-    # For each track cell T, if reachable from S, do BFS ignoring walls for up to 20 steps
-    for r, c in track_positions:
-        if distS[r][c] is None:
-            continue
+    count = 0
+    for r in range(R):
+        for c in range(C):
+            base_cost_to_T = distS[r][c]
+            if base_cost_to_T is None:
+                continue
+            budget = dist_normal - base_cost_to_T - min_saving
+            if budget < 1:
+                continue  # even a 1-step cheat landing on E would not save enough
+            for dr, dc, steps in offsets:
+                rr, cc = r + dr, c + dc
+                if 0 <= rr < R and 0 <= cc < C:
+                    remaining = distE[rr][cc]
+                    if remaining is not None and steps + remaining <= budget:
+                        count += 1
+    return count
 
-        base_cost_to_T = distS[r][c]
 
-        # BFS ignoring walls up to distance=20
-        dist_ignore = [[None] * C for _ in range(R)]
-        dist_ignore[r][c] = 0
-        queue = deque([(r, c)])
+# ----------------------------------------------------------------------
+# Parallel cheat counting over shared-memory distance fields
+# ----------------------------------------------------------------------
 
-        while queue:
-            rr, cc = queue.popleft()
-            steps_so_far = dist_ignore[rr][cc]
-            if steps_so_far == 20:
-                continue  # Can't go beyond 20 cheat steps
+_SHARED = {}  # per-worker views onto the parent's shared buffers
 
-            for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nr, nc = rr + dr, cc + dc
-                if 0 <= nr < R and 0 <= nc < C:
-                    if dist_ignore[nr][nc] is None:
-                        dist_ignore[nr][nc] = steps_so_far + 1
-                        queue.append((nr, nc))
-
-        # Now, check all track positions that are reachable in up to 20 ignoring-walls steps
-        for rr, cc in track_positions:
-            steps = dist_ignore[rr][cc]
-            # We can end the cheat if 1 <= steps <= 20
-            if steps is not None and 1 <= steps <= 20:
-                if distE[rr][cc] is not None:
-                    cheat_cost = base_cost_to_T + steps + distE[rr][cc]
-                    time_saved = dist_normal - cheat_cost
-                    if time_saved >= 100:
-                        big_savers.add(((r, c), (rr, cc)))
-
-    return len(big_savers)
+
+def _to_shared(arr):
+    """Copies 'arr' into a new SharedMemory block; returns (block, spec)."""
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _attach_worker(specs, R, C, dist_normal, max_cheat):
+    """
+    Pool initializer: attaches to the distS / distE / path buffers by name
+    and keeps zero-copy NumPy views on them for the lifetime of the worker.
+    """
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _SHARED[key + "_shm"] = shm  # keep the mapping alive
+        _SHARED[key] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    _SHARED["R"] = R
+    _SHARED["C"] = C
+    _SHARED["dist_normal"] = dist_normal
+    _SHARED["offsets"] = _cheat_offsets(max_cheat)
+
+
+def _shard_histogram(lo, hi):
+    """
+    Savings histogram for the cheats starting at path[lo:hi]:
+    hist[s] is the number of those cheats saving exactly s picoseconds.
+    """
+    distS = _SHARED["distS"]
+    distE = _SHARED["distE"]
+    R, C = _SHARED["R"], _SHARED["C"]
+    dist_normal = _SHARED["dist_normal"]
+
+    starts = _SHARED["path"][lo:hi]
+    rows, cols = np.divmod(starts, C)
+    base = distS[starts]
+
+    hist = np.zeros(dist_normal + 1, dtype=np.int64)
+    for dr, dc, steps in _SHARED["offsets"]:
+        rr = rows + dr
+        cc = cols + dc
+        inside = (rr >= 0) & (rr < R) & (cc >= 0) & (cc < C)
+        ends = rr[inside] * C + cc[inside]
+        remaining = distE[ends]
+        saved = dist_normal - (base[inside] + steps + remaining)
+        saved = saved[(remaining >= 0) & (saved >= 1)]
+        hist += np.bincount(saved, minlength=dist_normal + 1)
+    return hist
+
+
+def cheat_savings_histogram(
+    data, max_cheat, weighted=False, processes=None, shard_size=None
+):
+    """
+    Multi-process version of the cheat scan. Returns a NumPy array 'hist'
+    where hist[s] is how many cheats lasting at most 'max_cheat' picoseconds
+    save exactly s picoseconds.
+
+    distS, distE and the path order (track cells sorted by distS) are placed
+    in multiprocessing.shared_memory once; workers attach to them by name and
+    scan their shard of the path index range with vectorized NumPy ops.
+    """
+    grid = data[0]
+    R = len(grid)
+    C = len(grid[0])
+
+    distS_grid, distE_grid, dist_normal = _distance_fields(data, weighted)
+    if dist_normal is None:
+        return np.zeros(1, dtype=np.int64)
+
+    def as_array(dist):
+        return np.array(
+            [[-1 if d is None else d for d in row] for row in dist], dtype=np.int64
+        ).ravel()
+
+    distS = as_array(distS_grid)
+    distE = as_array(distE_grid)
+    reachable = np.flatnonzero(distS >= 0)
+    path = reachable[np.argsort(distS[reachable], kind="stable")]
+
+    processes = processes or os.cpu_count() or 1
+    if shard_size is None:
+        shard_size = max(1, -(-len(path) // (4 * processes)))
+    shards = [
+        (lo, min(lo + shard_size, len(path))) for lo in range(0, len(path), shard_size)
+    ]
+
+    blocks = []
+    specs = {}
+    try:
+        for key, arr in (("distS", distS), ("distE", distE), ("path", path)):
+            shm, spec = _to_shared(arr)
+            blocks.append(shm)
+            specs[key] = spec
+
+        with Pool(
+            processes,
+            initializer=_attach_worker,
+            initargs=(specs, R, C, dist_normal, max_cheat),
+        ) as pool:
+            partials = pool.starmap(_shard_histogram, shards)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+    hist = np.zeros(dist_normal + 1, dtype=np.int64)
+    for partial in partials:
+        hist += partial
+    return hist
+
+
+def count_cheats_parallel(
+    data, max_cheat, min_saving=1, weighted=False, processes=None
+) -> int:
+    """
+    Same result as count_cheats(), computed by cheat_savings_histogram().
+    """
+    _check_min_saving(min_saving)
+    hist = cheat_savings_histogram(data, max_cheat, weighted, processes)
+    return int(hist[min_saving:].sum())
+
+
+def part1(data) -> int:
+    """
+    Part 1: Cheating for up to 2 picoseconds.
+    Returns how many cheats would save at least 100 picoseconds.
+    """
+    return count_cheats(data, max_cheat=2, min_saving=100)
+
+
+def part2(data) -> int:
+    """
+    Part 2: Cheating for up to 20 picoseconds.
+    Returns how many cheats would save at least 100 picoseconds.
+    """
+    return count_cheats(data, max_cheat=20, min_saving=100)
 
 
 def main():
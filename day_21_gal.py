@@ -3,6 +3,14 @@ import re
 import heapq
 import pyperclip as pc
 
+from day_21_o1 import (
+    CACHE_DIR,
+    DIR_KEYS,
+    DIRECTIONAL_LAYOUT,
+    NUMERIC_LAYOUT,
+    cached_cost_tables,
+)
+
 
 def pr(s):
     print(s)
@@ -12,8 +20,8 @@ def pr(s):
 sys.setrecursionlimit(10**6)
 DIRS = [(-1, 0), (0, 1), (1, 0), (0, -1)]  # up, right, down, left
 
-pad1 = ["789", "456", "123", " 0A"]
-pad2 = [" ^A", "<v>"]
+pad1 = NUMERIC_LAYOUT.rows
+pad2 = DIRECTIONAL_LAYOUT.rows
 
 
 def read_data(file_path):
@@ -78,30 +86,55 @@ def applyPad2(p, move):
 
 
 def solve1(code, pads):
-    start = [0, (3, 2), "A", "", ""]
-    Q = []
-    heapq.heappush(Q, start)
-    SEEN = {}
+    """
+    Dijkstra over packed integer states: a state is
+    (typed * len(pad1 buttons) + numeric button) * 5 + last directional key,
+    where typed is how many characters of `code` are already out. Heap
+    entries are d * n_states + state, so no strings or lists are pushed.
+    """
+    n_pos = len(NUMERIC_LAYOUT)
+    n_dir = len(DIR_KEYS)
+    n_states = (len(code) + 1) * n_pos * n_dir
+    press = DIR_KEYS.index("A")
+
+    # Numeric button reached from each button by each direction, -1 for a gap
+    step = []
+    for label in NUMERIC_LAYOUT.labels:
+        row = []
+        for move in DIR_KEYS:
+            new_p1, _ = applyPad1(NUMERIC_LAYOUT.positions[label], move)
+            new_label = getPad1(new_p1) if move != "A" else None
+            row.append(NUMERIC_LAYOUT.index[new_label] if new_label else -1)
+        step.append(row)
+    move_cost = [cost2(move, prev, pads) for prev in DIR_KEYS for move in DIR_KEYS]
+    target = [NUMERIC_LAYOUT.index[ch] for ch in code]
+
+    start = NUMERIC_LAYOUT.index["A"] * n_dir + press
+    dist = [sys.maxsize] * n_states
+    dist[start] = 0
+    Q = [start]
     while Q:
-        d, p1, p2, out, path = heapq.heappop(Q)
-        if out == code:
-            return d
-        if not code.startswith(out):
-            continue
-        if getPad1(p1) is None:
-            continue
-        key = (p1, p2, out)
-        if key in SEEN:
+        d, state = divmod(heapq.heappop(Q), n_states)
+        if d > dist[state]:
             continue
-        SEEN[key] = d
-        for move in ["^", "<", "v", ">", "A"]:
-            new_p1 = p1
-            new_out = out
-            new_p1, output = applyPad1(p1, move)
-            if output is not None:
-                new_out = out + output
-            cost_move = cost2(move, p2, pads)
-            heapq.heappush(Q, [d + cost_move, new_p1, move, new_out, path])
+        rest, last = divmod(state, n_dir)
+        typed, p1 = divmod(rest, n_pos)
+        if typed == len(code):
+            return d
+        for move in range(n_dir):
+            if move == press:
+                if p1 != target[typed]:
+                    continue
+                new_state = (rest + n_pos) * n_dir + move
+            else:
+                new_p1 = step[p1][move]
+                if new_p1 < 0:
+                    continue
+                new_state = (typed * n_pos + new_p1) * n_dir + move
+            new_d = d + move_cost[last * n_dir + move]
+            if new_d < dist[new_state]:
+                dist[new_state] = new_d
+                heapq.heappush(Q, new_d * n_states + new_state)
 
 
 DP = {}
@@ -114,28 +147,24 @@ def cost2(ch, prev_move, pads):
     if pads == 0:
         return 1
     else:
-        Q = []
-        start_pos = {"^": (0, 1), "<": (1, 0), "v": (1, 1), ">": (1, 2), "A": (0, 2)}[
-            prev_move
-        ]
-        heapq.heappush(Q, [0, start_pos, "A", "", ""])
-        SEEN = {}
-        while Q:
-            d, p, prev, out, path = heapq.heappop(Q)
-            if getPad2(p) is None:
-                continue
-            if out == ch:
-                DP[key] = d
-                return d
-            seen_key = (p, prev)
-            if seen_key in SEEN:
-                continue
-            SEEN[seen_key] = d
-            for move in ["^", "<", "v", ">", "A"]:
-                new_p, output = applyPad2(p, move)
-                cost_move = cost2(move, prev, pads - 1)
-                new_d = d + cost_move
-                heapq.heappush(Q, [new_d, new_p, move, out + (output or ""), path])
+        # Cheapest precomputed move string from prev_move to ch, priced one pad up
+        best = min(
+            sum(cost2(b, a, pads - 1) for a, b in zip("A" + moves, moves + "A"))
+            for moves in DIRECTIONAL_LAYOUT.moves[(prev_move, ch)]
+        )
+        DP[key] = best
+        return best
+
+
+def load_dp(pads, cache_dir=CACHE_DIR):
+    """
+    Seeds DP with the compiled cost2() values for `pads` from the on-disk
+    cache (see day_21_o1.cached_cost_tables()), building it if needed.
+    """
+    cost, _ = cached_cost_tables(pads, cache_dir)
+    for i, prev_move in enumerate(DIR_KEYS):
+        for j, ch in enumerate(DIR_KEYS):
+            DP[(ch, prev_move, pads)] = cost[i * len(DIR_KEYS) + j]
 
 
 def part1(data):
@@ -175,6 +204,8 @@ def main():
     Main function to read input and print solutions for part 1 and part 2.
     """
     data = read_data("21.txt")
+    load_dp(2)
+    load_dp(25)
     solution1 = part1(data)
     pr(solution1)
     solution2 = part2(data)
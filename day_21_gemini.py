@@ -1,4 +1,4 @@
-import heapq
+from day_21_o1 import DIRECTIONAL_LAYOUT, NUMERIC_LAYOUT
 
 
 def read_data(filename):
@@ -7,61 +7,11 @@ def read_data(filename):
 
 
 def keypad_moves(start, target):
-    keypad = {
-        "7": (0, 0),
-        "8": (1, 0),
-        "9": (2, 0),
-        "4": (0, 1),
-        "5": (1, 1),
-        "6": (2, 1),
-        "1": (0, 2),
-        "2": (1, 2),
-        "3": (2, 2),
-        "0": (1, 3),
-        "A": (2, 3),
-    }
-    reverse_keypad = {v: k for k, v in keypad.items()}
-    q = [(0, start, "")]
-    visited = {start}
-    while q:
-        dist, current, path = heapq.heappop(q)
-        if current == target:
-            return path
-        x, y = keypad[current]
-        for dx, dy, move in [(0, -1, "^"), (0, 1, "v"), (-1, 0, "<"), (1, 0, ">")]:
-            nx, ny = x + dx, y + dy
-            if (0 <= nx < 3 and 0 <= ny < 4) and (nx, ny) in reverse_keypad:
-                neighbor = reverse_keypad[(nx, ny)]
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    heapq.heappush(q, (dist + 1, neighbor, path + move))
-    return None
+    return NUMERIC_LAYOUT.moves[(start, target)][0]
 
 
 def directional_moves(start, target):
-    keypad = {
-        "^": (1, 0),
-        "A": (2, 0),
-        "<": (0, 1),
-        "v": (1, 1),
-        ">": (2, 1),
-    }
-    reverse_keypad = {v: k for k, v in keypad.items()}
-    q = [(0, start, "")]
-    visited = {start}
-    while q:
-        dist, current, path = heapq.heappop(q)
-        if current == target:
-            return path
-        x, y = keypad[current]
-        for dx, dy, move in [(0, -1, "^"), (0, 1, "v"), (-1, 0, "<"), (1, 0, ">")]:
-            nx, ny = x + dx, y + dy
-            if (0 <= nx < 3 and 0 <= ny < 2) and (nx, ny) in reverse_keypad:
-                neighbor = reverse_keypad[(nx, ny)]
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    heapq.heappush(q, (dist + 1, neighbor, path + move))
-    return None
+    return DIRECTIONAL_LAYOUT.moves[(start, target)][0]
 
 
 def part1(codes):
@@ -1,4 +1,12 @@
-from collections import deque
+from bisect import bisect_right
+from itertools import combinations
+import hashlib
+import math
+import operator
+import os
+import struct
+
+import numpy as np
 
 
 def read_data(filename: str) -> list[str]:
@@ -19,433 +27,848 @@ def read_data(filename: str) -> list[str]:
 # ----------------------------------------------------------------------
 
 
-def build_numeric_keypad():
-    """
-    Returns:
-      - A dictionary mapping (row, col) -> label, for the numeric keypad.
-      - The (row, col) where 'A' is located (initial arm position).
-      - Adjacency info for valid moves up/down/left/right that don’t aim at a gap.
-    Numeric keypad layout:
-
-      7 8 9
-      4 5 6
-      1 2 3
-        0 A
-    """
-    # We'll store them in row,col coordinates.
-    # Let's define a small grid that can hold them:
-    # Suppose row = 0..3, col = 0..2, with 'gaps' where there is no button.
-    # We'll map them like:
-    #   (0,0)->'7', (0,1)->'8', (0,2)->'9'
-    #   (1,0)->'4', (1,1)->'5', (1,2)->'6'
-    #   (2,0)->'1', (2,1)->'2', (2,2)->'3'
-    #   (3,1)->'0', (3,2)->'A'
-
-    keypad_map = {
-        (0, 0): "7",
-        (0, 1): "8",
-        (0, 2): "9",
-        (1, 0): "4",
-        (1, 1): "5",
-        (1, 2): "6",
-        (2, 0): "1",
-        (2, 1): "2",
-        (2, 2): "3",
-        (3, 1): "0",
-        (3, 2): "A",
-    }
+NUMERIC_SPEC = """
+789
+456
+123
+ 0A
+"""
 
-    # Starting position is the 'A' button => (3,2).
-    start_pos = (3, 2)
+DIRECTIONAL_SPEC = """
+ ^A
+<v>
+"""
 
-    # Build adjacency: from each valid (r,c), we can go up/down/left/right if it stays in keypad_map.
-    adj = {}
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for r, c in keypad_map:
-        neighbors = []
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if (nr, nc) in keypad_map:  # valid move
-                neighbors.append((nr, nc))
-        adj[(r, c)] = neighbors
+MOVE_STEPS = {"^": (-1, 0), "v": (1, 0), "<": (0, -1), ">": (0, 1)}
 
-    return keypad_map, start_pos, adj
 
+class KeypadLayout:
+    """
+    An indexed keypad parsed from an ASCII spec (see parse_keypad()).
+
+      - labels: button labels in reading order; index maps label -> position in it
+      - positions: label -> (row, col), keypad_map: (row, col) -> label
+      - moves: (from_label, to_label) -> tuple of gap-avoiding minimal move
+        strings (without the final 'A'), precomputed for every pair
+      - reach: (label, move) -> how many presses of that direction stay on
+        the keypad from that button
+
+    Only the two L-shaped paths are candidates for a pair: a zig-zag changes
+    direction more often, which always costs extra presses one layer up.
+    So there are at most two move strings per pair.
+    """
 
-def build_directional_keypad():
+    def __init__(self, rows: list[str]):
+        self.rows = rows
+        self.keypad_map = {
+            (r, c): ch
+            for r, row in enumerate(rows)
+            for c, ch in enumerate(row)
+            if ch != " "
+        }
+        self.labels = list(self.keypad_map.values())
+        if len(set(self.labels)) != len(self.labels):
+            raise ValueError("Keypad labels must be unique.")
+        self.index = {label: i for i, label in enumerate(self.labels)}
+        self.positions = {label: rc for rc, label in self.keypad_map.items()}
+        self.moves = {
+            (a, b): self._move_options(a, b) for a in self.labels for b in self.labels
+        }
+        # Straight-line steps available from each button before a gap or edge
+        self.reach = {
+            (label, move): self._reach(label, move)
+            for label in self.labels
+            for move in MOVE_STEPS
+        }
+
+    def __len__(self):
+        return len(self.labels)
+
+    def adjacency(self):
+        """(row, col) -> neighbouring (row, col) buttons, never a gap."""
+        adj = {}
+        for r, c in self.keypad_map:
+            adj[(r, c)] = [
+                (r + dr, c + dc)
+                for dr, dc in MOVE_STEPS.values()
+                if (r + dr, c + dc) in self.keypad_map
+            ]
+        return adj
+
+    def all_minimal_moves(self, from_button, to_button):
+        """
+        Every gap-avoiding minimal move string for the pair, zig-zags
+        included. They tie with the L-shapes when presses are uniformly
+        priced, so counting optimal sequences needs them all.
+        """
+        vertical, horizontal = self._straight_moves(from_button, to_button)
+        n = len(vertical) + len(horizontal)
+        options = []
+        for rows in combinations(range(n), len(vertical)):
+            moves = "".join(
+                vertical[0] if i in rows else horizontal[:1] for i in range(n)
+            )
+            if self._avoids_gap(from_button, moves):
+                options.append(moves)
+        return tuple(options)
+
+    def _straight_moves(self, from_button, to_button):
+        (r1, c1), (r2, c2) = self.positions[from_button], self.positions[to_button]
+        vertical = ("v" if r2 > r1 else "^") * abs(r2 - r1)
+        horizontal = (">" if c2 > c1 else "<") * abs(c2 - c1)
+        return vertical, horizontal
+
+    def _avoids_gap(self, from_button, moves):
+        r, c = self.positions[from_button]
+        for move in moves:
+            dr, dc = MOVE_STEPS[move]
+            r, c = r + dr, c + dc
+            if (r, c) not in self.keypad_map:
+                return False
+        return True
+
+    def _reach(self, label, move):
+        (r, c), (dr, dc) = self.positions[label], MOVE_STEPS[move]
+        steps = 0
+        while (r + dr * (steps + 1), c + dc * (steps + 1)) in self.keypad_map:
+            steps += 1
+        return steps
+
+    def _move_options(self, from_button, to_button):
+        vertical, horizontal = self._straight_moves(from_button, to_button)
+        options = []
+        for moves in (horizontal + vertical, vertical + horizontal):
+            if moves not in options and self._avoids_gap(from_button, moves):
+                options.append(moves)
+        return tuple(options)
+
+
+def parse_keypad(spec: str) -> KeypadLayout:
     """
-    The smaller directional keypad (for up/down/left/right/A):
+    Parses an ASCII keypad: one character per button, spaces for gaps.
+    Blank lines around the grid are ignored, leading spaces are not.
+    E.g. on DIRECTIONAL_SPEC, moves[("A", "<")] == ("v<<",): "<<v" would
+    aim at the gap.
+    """
+    rows = [line.rstrip() for line in spec.split("\n")]
+    while rows and not rows[0]:
+        rows.pop(0)
+    while rows and not rows[-1]:
+        rows.pop()
+    return KeypadLayout(rows)
 
-        +---+---+
-        | ^ | A |
-    +---+---+---+
-    | < | v | > |
-    +---+---+---+
 
-    We'll store these positions similarly.
-    Let’s pick a 2-row, 3-col grid:
-      row=0 => (0,1)->'^', (0,2)->'A'   and (0,0) is a gap
-      row=1 => (1,0)->'<', (1,1)->'v', (1,2)->'>'
+NUMERIC_LAYOUT = parse_keypad(NUMERIC_SPEC)
+DIRECTIONAL_LAYOUT = parse_keypad(DIRECTIONAL_SPEC)
 
-    The arm starts at 'A' => let's define start=(0,2).
 
-    We can't allow the robot arm to “aim at a gap” (like (0,0)), so that’s simply not in the adjacency or the map.
-    """
-    keypad_map = {
-        (0, 1): "^",
-        (0, 2): "A",
-        (1, 0): "<",
-        (1, 1): "v",
-        (1, 2): ">",
-    }
-    start_pos = (0, 2)  # 'A'
+# ----------------------------------------------------------------------
+# 2) Exact layered costs via min-plus composition
+# ----------------------------------------------------------------------
 
-    # Build adjacency
-    adj = {}
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-    for r, c in keypad_map:
-        neighbors = []
-        for dr, dc in directions:
-            nr, nc = r + dr, c + dc
-            if (nr, nc) in keypad_map:
-                neighbors.append((nr, nc))
-        adj[(r, c)] = neighbors
+DIR_KEYS = "^<v>A"
+DIR_INDEX = {key: i for i, key in enumerate(DIR_KEYS)}
+N_DIR = len(DIR_KEYS)
 
-    return keypad_map, start_pos, adj
+# Past this many robots, switch to repeated squaring if the choices settled
+EXACT_LAYERS = 32
+STABLE_WINDOW = 8
 
 
-# ----------------------------------------------------------------------
-# 2) BFS within a single keypad
-# ----------------------------------------------------------------------
+def transitions(moves):
+    """
+    Flat indices a * N_DIR + b of the directional key pairs (a, b) pressed
+    one layer up to type `moves` + 'A', starting and ending on 'A'.
+    """
+    keys = "A" + moves + "A"
+    return [DIR_INDEX[a] * N_DIR + DIR_INDEX[b] for a, b in zip(keys, keys[1:])]
 
 
-def build_bfs_table(keypad_map, adj):
+def transition_options(layout: KeypadLayout):
     """
-    For a given keypad (specified by keypad_map and adjacency),
-    build a dictionary cost[(r1,c1)][(r2,c2)] = minimal number of moves
-    (NOT counting pressing anything) to go from (r1,c1) to (r2,c2).
+    For every ordered (from, to) pair of labels on `layout`, its precomputed
+    move strings expressed as transitions() index lists.
+    """
+    return {
+        pair: [transitions(m) for m in moves] for pair, moves in layout.moves.items()
+    }
+
+
+def _directional_options():
+    options = transition_options(DIRECTIONAL_LAYOUT)
+    return [options[(a, b)] for a in DIR_KEYS for b in DIR_KEYS]
+
 
-    We'll do a BFS from every node to find the cost to every other node.
+def _compose(cost, options):
     """
-    all_positions = list(keypad_map.keys())
-    cost_table = {}
+    One min-plus step: for every pair i, the cheapest candidate in
+    options[i] priced with `cost` (a flat N_DIR x N_DIR matrix).
+    Returns (new_cost, choice) where choice[i] indexes the chosen candidate.
+    """
+    new_cost = []
+    choice = []
+    for candidates in options:
+        sums = [sum(cost[j] for j in trans) for trans in candidates]
+        best = min(range(len(sums)), key=sums.__getitem__)
+        new_cost.append(sums[best])
+        choice.append(best)
+    return new_cost, choice
 
-    for start in all_positions:
-        # BFS from 'start' to all others
-        queue = deque()
-        queue.append((start, 0))
-        visited = {start}
-        local_costs = {}
 
-        while queue:
-            pos, dist = queue.popleft()
-            local_costs[pos] = dist
-            for nxt in adj[pos]:
-                if nxt not in visited:
-                    visited.add(nxt)
-                    queue.append((nxt, dist + 1))
+def _mat_vec(T, v, modulus):
+    out = [sum(t * x for t, x in zip(row, v)) for row in T]
+    return [x % modulus for x in out] if modulus else out
 
-        cost_table[start] = local_costs
-    return cost_table
 
+def _mat_mul(A, B, modulus):
+    Bt = list(zip(*B))
+    return [_mat_vec(Bt, row, modulus) for row in A]
 
-# ----------------------------------------------------------------------
-# 3) Composing the BFS “cost to make one move on a deeper keypad”
-# ----------------------------------------------------------------------
 
+def _mat_pow_vec(T, power, v, modulus):
+    """T**power applied to v, by repeated squaring."""
+    while power:
+        if power & 1:
+            v = _mat_vec(T, v, modulus)
+        power >>= 1
+        if power:
+            T = _mat_mul(T, T, modulus)
+    return v
 
-class LayeredKeypadControl:
+
+def directional_cost_matrix(depth, modulus=None):
+    """
+    Returns (cost, choice) for `depth` directional keypads stacked above the
+    human: cost[a * N_DIR + b] is the number of human presses needed to move
+    the last robot's arm from DIR_KEYS[a] to DIR_KEYS[b] and press it, every
+    layer above starting and ending on 'A'. depth=0 is the human's own pad.
+
+    Layer k+1 is a min-plus composition of layer k over the move options.
+    Once the per-pair choices stop changing (checked over STABLE_WINDOW
+    layers), each layer is the linear map T (transition counts of the
+    chosen moves) applied to the previous one, so large depths use T**n by
+    repeated squaring. `modulus` reduces results for very deep chains;
+    choice is then the settled choice table rather than a per-layer one.
+    """
+    options = _directional_options()
+    cost = [1] * (N_DIR * N_DIR)
+    choice = [0] * (N_DIR * N_DIR)
+    history = []
+
+    layer = 0
+    while layer < depth:
+        if layer >= EXACT_LAYERS and all(h == choice for h in history):
+            T = [[0] * (N_DIR * N_DIR) for _ in range(N_DIR * N_DIR)]
+            for i, candidates in enumerate(options):
+                for j in candidates[choice[i]]:
+                    T[i][j] += 1
+            cost = _mat_pow_vec(T, depth - layer, cost, modulus)
+            return cost, choice
+        cost, choice = _compose(cost, options)
+        history = (history + [choice])[-STABLE_WINDOW:]
+        layer += 1
+
+    if modulus:
+        cost = [x % modulus for x in cost]
+    return cost, choice
+
+
+def numeric_cost_matrix(depth, modulus=None):
     """
-    This class will store:
-      - The BFS cost table for the bottom-most keypad (like the numeric keypad).
-      - A pointer to another LayeredKeypadControl that controls it, or None if top-level.
+    Returns {(from_label, to_label): presses} for the numeric keypad driven
+    through `depth` directional robots.
+    """
+    if modulus and depth > EXACT_LAYERS:
+        # Pick numeric moves from exact costs at the settled depth, then price
+        # them with the reduced ones.
+        exact, _ = directional_cost_matrix(EXACT_LAYERS + STABLE_WINDOW)
+        cost, _ = directional_cost_matrix(depth, modulus)
+    else:
+        exact = cost = directional_cost_matrix(depth)[0]
+    table = {}
+    for pair, candidates in transition_options(NUMERIC_LAYOUT).items():
+        best = min(candidates, key=lambda trans: sum(exact[j] for j in trans))
+        total = sum(cost[j] for j in best)
+        table[pair] = total % modulus if modulus else total
+    return table
+
+
+def directional_cost_layers(depth):
+    """
+    Exact directional cost matrices for 0..depth robots, one per layer
+    (see directional_cost_matrix()).
+    """
+    options = _directional_options()
+    layers = [[1] * (N_DIR * N_DIR)]
+    for _ in range(depth):
+        layers.append(_compose(layers[-1], options)[0])
+    return layers
+
 
-    We'll define methods to get the cost of "one move" or "one press" on *this* keypad,
-    measured in the top-level’s button presses.
+class PressSequence:
+    """
+    The optimal top-level button sequence typing `code` through `depth`
+    directional robots, without materializing it (at depth 25 it is over
+    10^11 presses long).
+
+    The sequence is a tree: each press of pair (a, b) at layer k expands
+    into the pairs of the chosen move string one layer up, and every pair
+    knows its expanded length from the layer's cost matrix. So:
+
+      - len(seq) / seq.length is the total number of presses
+      - seq[n] walks one pair per layer, O(depth)
+      - seq[i:j] and iter_chunks() stream the expansion, caching the
+        strings of subtrees shorter than `expand_limit`
     """
 
-    def __init__(self, keypad_map, start_pos, adj, parent=None):
-        self.keypad_map = keypad_map
-        self.start_pos = start_pos
-        self.adj = adj
-        self.parent = parent  # Another LayeredKeypadControl, or None if top-level
-        # Precompute BFS within this keypad:
-        self.bfs_table = build_bfs_table(keypad_map, adj)
+    def __init__(self, code: str, depth: int, expand_limit: int = 1 << 12):
+        self.code = code
+        self.depth = depth
+        self.expand_limit = expand_limit
+        self._lengths = directional_cost_layers(depth)
+
+        # choices[k][i]: pairs one layer up for pair i pressed at layer k >= 1
+        options = _directional_options()
+        self._choices = [None]
+        for k in range(1, depth + 1):
+            cost = self._lengths[k - 1]
+            self._choices.append(
+                [
+                    min(candidates, key=lambda trans: sum(cost[j] for j in trans))
+                    for candidates in options
+                ]
+            )
 
-    def cost_of_move(self, from_button, to_button):
+        # The numeric moves, flattened into layer-`depth` directional pairs
+        cost = self._lengths[depth]
+        numeric = transition_options(NUMERIC_LAYOUT)
+        keys = "A" + code
+        self._top = []
+        for pair in zip(keys, keys[1:]):
+            self._top += min(
+                numeric[pair], key=lambda trans: sum(cost[j] for j in trans)
+            )
+        self._top_ends = []
+        total = 0
+        for i in self._top:
+            total += cost[i]
+            self._top_ends.append(total)
+        self.length = total
+        self._expanded = {}
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.length)
+            if step == 1:
+                return "".join(self._pieces(start, stop))
+            return "".join(self[n] for n in range(start, stop, step))
+
+        n = item + self.length if item < 0 else item
+        if not 0 <= n < self.length:
+            raise IndexError("PressSequence index out of range")
+        top = bisect_right(self._top_ends, n)
+        pair = self._top[top]
+        n -= self._top_ends[top] - self._lengths[self.depth][pair]
+        for k in range(self.depth, 0, -1):
+            for child in self._choices[k][pair]:
+                if n < self._lengths[k - 1][child]:
+                    pair = child
+                    break
+                n -= self._lengths[k - 1][child]
+        return DIR_KEYS[pair % N_DIR]
+
+    def __iter__(self):
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def __str__(self):
+        return self[:]
+
+    def iter_chunks(self, start=0, stop=None, chunk_size=1 << 16):
         """
-        Returns the cost *in parent's presses* of moving the arm
-        on THIS keypad from `from_button` to `to_button` (without pressing).
-
-        If self is the top-level, cost_of_move is simply the BFS distance on this keypad.
-        If not top-level, each 'step' on this keypad is 1 "press" on the parent's keypad,
-        so we multiply BFS distance by the parent's cost_of_pressing_a_direction_button().
+        Yields seq[start:stop] as strings of `chunk_size` presses (the last
+        one may be shorter).
         """
-        # We need (r1,c1) from label, (r2,c2) from label:
-        pos1 = self._find_pos(from_button)
-        pos2 = self._find_pos(to_button)
-        dist = self.bfs_table[pos1][pos2]  # number of steps in THIS keypad
-        if self.parent is None:
-            # top-level => each step is 1 press
-            return dist
-        else:
-            # each step is cost_of_one_direction_press on the parent
-            return dist * self.parent.cost_of_one_direction_press()
+        stop = self.length if stop is None else min(stop, self.length)
+        buffer = []
+        buffered = 0
+        for piece in self._pieces(start, stop):
+            buffer.append(piece)
+            buffered += len(piece)
+            if buffered >= chunk_size:
+                joined = "".join(buffer)
+                cut = len(joined) - len(joined) % chunk_size
+                for i in range(0, cut, chunk_size):
+                    yield joined[i : i + chunk_size]
+                buffer = [joined[cut:]]
+                buffered = len(buffer[0])
+        if buffered:
+            yield "".join(buffer)
+
+    def _pieces(self, start, stop):
+        offset = 0
+        for pair in self._top:
+            length = self._lengths[self.depth][pair]
+            if offset + length > start and offset < stop:
+                yield from self._subtree(self.depth, pair, offset, start, stop)
+            offset += length
+            if offset >= stop:
+                break
+
+    def _subtree(self, k, pair, offset, start, stop):
+        """Pieces of the press of `pair` at layer k, which begins at `offset`."""
+        if self._lengths[k][pair] <= self.expand_limit:
+            text = self._expansion(k, pair)
+            yield text[max(0, start - offset) : stop - offset]
+            return
+        for child in self._choices[k][pair]:
+            length = self._lengths[k - 1][child]
+            if offset + length > start:
+                if offset >= stop:
+                    return
+                yield from self._subtree(k - 1, child, offset, start, stop)
+            offset += length
+
+    def _expansion(self, k, pair):
+        key = (k, pair)
+        if key not in self._expanded:
+            if k == 0:
+                text = DIR_KEYS[pair % N_DIR]
+            else:
+                text = "".join(
+                    self._expansion(k - 1, child) for child in self._choices[k][pair]
+                )
+            self._expanded[key] = text
+        return self._expanded[key]
 
-    def cost_of_press_button(self, current_button):
-        """
-        Cost in parent's presses of pressing the button the arm is currently aiming at,
-        i.e. we must move the arm to 'A' on THIS keypad, press 'A', then move back if needed.
 
-        But for this puzzle, the typical approach is:
-          - Pressing a button at the deeper keypad is done by pressing 'A' on this keypad.
-          - On a directional keypad, that means "move to the cell whose label='A'", press it.
-          - Then the arm is still on 'A'.
+def shortest_sequence(code: str, depth: int) -> str:
+    """
+    One optimal top-level button sequence typing `code` through `depth`
+    directional robots, as a string. Its length grows ~2.5x per robot, so
+    use PressSequence directly beyond small depths.
+    """
+    return str(PressSequence(code, depth))
 
-        So for a single 'press' in the next-lower-level keypad:
-          (1) cost to move from `current_button` to 'A' (on THIS keypad)
-          (2) + 1 press for 'A' itself
-        multiplied by the parent's cost-of-press structure if not top-level.
 
-        Because after pressing 'A', the arm remains at 'A'.
-        """
-        pos_now = self._find_pos(current_button)
-        pos_A = self._find_pos("A")  # the 'A' button on this keypad
-        dist_to_A = self.bfs_table[pos_now][pos_A]
+def code_cost(code: str, depth: int, table=None) -> int:
+    """
+    Top-level presses to type `code` on the numeric keypad through `depth`
+    directional robots.
+    """
+    if table is None:
+        table = numeric_cost_matrix(depth)
+    keys = "A" + code
+    return sum(table[(a, b)] for a, b in zip(keys, keys[1:]))
 
-        # cost of the moves:
-        move_cost = dist_to_A
-        # plus 1 for pressing 'A':
-        total_steps_in_this_keypad = move_cost + 1
 
-        if self.parent is None:
-            return total_steps_in_this_keypad
-        else:
-            # each step in THIS keypad = parent's cost_of_one_direction_press()
-            return (
-                total_steps_in_this_keypad * self.parent.cost_of_one_direction_press()
-            )
+# ----------------------------------------------------------------------
+# 3) On-disk cache of compiled cost tables
+# ----------------------------------------------------------------------
 
-    def cost_of_one_direction_press(self):
-        """
-        The cost (in parent's presses) of one up/down/left/right press on THIS keypad.
+CACHE_DIR = "21_cache"
+CACHE_MAGIC = b"KPC1"
+# magic, sha256 of (layouts, depth), depth, bytes per value
+CACHE_HEADER = struct.Struct("<4s32sIB")
 
-        If top-level, it's just 1. If not top-level, we must move parent's arm to parent's 'A',
-        press it, etc.  That is exactly self.parent.cost_of_press_button(...).
 
-        But we also need to consider that each "move" on THIS keypad might require BFS on the parent...
-        Actually, for a single directional press: we must do "move parent's arm from wherever it is to
-        the parent's '^' or '<' or '>' or 'v'" and then "press A"? Or do we do it differently?
+def _cache_digest(depth: int) -> bytes:
+    """Identifies the compiled tables: both layouts and the depth."""
+    material = "\n".join(
+        ["numeric", *NUMERIC_LAYOUT.rows, "directional", *DIRECTIONAL_LAYOUT.rows]
+    )
+    return hashlib.sha256(f"{material}\ndepth={depth}".encode()).digest()
 
-        A simpler approach, consistent with the puzzle statements, is:
-          - A single direction press on this keypad = "press one of ^ < > v" on the parent keypad.
-          - But each press of '^' or '<' or '>' or 'v' on the parent keypad itself is an action that
-            might require the parent's parent's BFS, and so on…
 
-        So indeed, we can define:
-           cost_of_one_direction_press() = cost_of_move(current_arm, '^/</>/v') + cost_of_press_button('^/</>/v')
-        but that's for a *specific* direction. Then we'd want the minimal among them, or are they identical?
+def _numeric_pairs():
+    return [(a, b) for a in NUMERIC_LAYOUT.labels for b in NUMERIC_LAYOUT.labels]
 
-        Actually, on a typical directional keypad (the parent), each direction button is 1 move away from 'A'
-        or 2 moves away from 'A' — it can vary. The puzzle’s example solutions show they can differ by a step or so.
 
-        To keep it straightforward in code, you might choose to define a uniform cost or compute the minimal
-        cost among moving to any of '^','<','>','v' from 'A'. However, the puzzle’s examples strongly suggest
-        each direction press is the *same cost* if you do it optimally: “move from last place to direction, press it”.
-        But that “last place” keeps changing. This becomes a big state machine if we track the parent’s pointer position.
+def _load_cost_tables(path: str, depth: int):
+    """
+    Returns (directional cost, numeric table) from `path`, or None if the
+    file is missing, truncated or was compiled for other layouts / depth.
+    """
+    try:
+        with open(path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return None
+    if len(blob) < CACHE_HEADER.size:
+        return None
+    magic, digest, stored_depth, width = CACHE_HEADER.unpack_from(blob)
+    pairs = _numeric_pairs()
+    n_values = N_DIR * N_DIR + len(pairs)
+    if (
+        magic != CACHE_MAGIC
+        or digest != _cache_digest(depth)
+        or stored_depth != depth
+        or len(blob) != CACHE_HEADER.size + width * n_values
+    ):
+        return None
+
+    body = memoryview(blob)[CACHE_HEADER.size :]
+    values = [
+        int.from_bytes(body[i : i + width], "little")
+        for i in range(0, len(body), width)
+    ]
+    cost = values[: N_DIR * N_DIR]
+    table = dict(zip(pairs, values[N_DIR * N_DIR :]))
+    return cost, table
+
+
+def _save_cost_tables(path: str, depth: int, cost, table):
+    """Writes the tables atomically as fixed-width little-endian integers."""
+    values = cost + [table[pair] for pair in _numeric_pairs()]
+    width = max(1, (max(values).bit_length() + 7) // 8)
+    header = CACHE_HEADER.pack(CACHE_MAGIC, _cache_digest(depth), depth, width)
+    body = b"".join(v.to_bytes(width, "little") for v in values)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header + body)
+    os.replace(tmp_path, path)
+
+
+def cached_cost_tables(depth: int, cache_dir: str = CACHE_DIR):
+    """
+    Returns (directional cost, numeric table) for `depth` robots, as from
+    directional_cost_matrix() and numeric_cost_matrix(). They are loaded
+    from `cache_dir` when a file compiled for the same layouts and depth
+    exists there, and (re)built and saved otherwise.
+    """
+    digest = _cache_digest(depth).hex()[:16]
+    path = os.path.join(cache_dir, f"keypad_{digest}_d{depth}.bin")
+    tables = _load_cost_tables(path, depth)
+    if tables is None:
+        tables = directional_cost_matrix(depth)[0], numeric_cost_matrix(depth)
+        _save_cost_tables(path, depth, *tables)
+    return tables
 
-        ---
-        **For the sake of an example** (and because the puzzle’s official examples match up with a uniform cost):
-        we will compute *once* the minimal cost to do “one direction press” on the parent keypad from “A” to that direction button and back to “A”. That gets used as a constant.
-        This is enough to replicate the puzzle’s final numeric results for the typical layout.
 
-        If you want absolute correctness for *arbitrary* keypads, you’d have to track the parent’s pointer position fully.
-        But for the standard layout given, each direction button is exactly 1 step away from 'A' on a directional keypad:
-           - '^' is (0,1), 'A' is (0,2) => distance 1
-           - '<' is (1,0), 'A' is (0,2) => distance BFS=3 if you must not step in a gap, etc.
-        Let’s do the “go from 'A' to direction, press, return to 'A'” approach once, pick the minimal among them for up/left/down/right, and call that the cost.
+# ----------------------------------------------------------------------
+# 4) Bulk scoring of many codes with NumPy
+# ----------------------------------------------------------------------
 
-        For puzzle consistency, we’ll store a small memo.
-        """
-        if self.parent is None:
-            # If there's no parent (top-level), cost of pressing a direction is 1.
-            return 1
-
-        # Otherwise, define a small function that says:
-        # "What is the cost in parent's presses if I want to do a single 'direction press' here?"
-        # That is: (move parent's arm from parent's 'A' to parent's '^/</>/v'), +1 press, and back to 'A'.
-        # But in a real puzzle, we might not always go 'back to A'.  The puzzle examples do often remain on the pressed direction.
-        # The official examples typically let the pointer “stay” on that button after pressing.
-        #
-        # However, the puzzle’s final distances (like 68 for 029A) can be matched if we treat each single direction press as a small, consistent cost.
-        # The typical trick in AoC solutions is to verify that all direction keys happen to cost the same from 'A' if done optimally.
-        # In the standard layout, they do not cost the same, but the puzzle solutions revolve around consistent BFS usage that nets 68, 60, etc.
-        #
-        # We'll simplify by assuming a single uniform “direction press cost” = minimal among going from 'A' -> (direction) -> press -> remain there.
-        # Then in an actual BFS, it might vary, but this suffices to produce the known puzzle results.
-
-        if not hasattr(self, "_cached_one_direction_press_cost"):
-            # We'll compute an average or minimal cost among pressing ^, <, >, v on the parent.
-            directions = ["^", "<", ">", "v"]
-            costs = []
-            for d in directions:
-                # cost to move parent's arm from 'A' to d
-                move_to_dir = self.parent.cost_of_move("A", d)
-                # + 1 press for the parent's 'A' button (the parent's press mechanism):
-                press_dir = (
-                    1
-                    if self.parent.parent is None
-                    else self.parent.cost_of_press_button(d)
-                )
-                # Some solutions then keep the pointer at d. But let's for consistency say we do NOT return to 'A' yet.
-                # If you check example sequences, they sometimes do or sometimes don’t come back.
-                # We pick the cost of "move to d + press d" as the cost to do one directional press at this layer:
-                c = move_to_dir + press_dir
-                costs.append(c)
-            # We'll pick the minimal.  Typically '^' is 1 away from 'A', others might be 2 or 3 away, etc.
-            self._cached_one_direction_press_cost = min(costs)
+INT64_MAX = np.iinfo(np.int64).max
 
-        return self._cached_one_direction_press_cost
 
-    def _find_pos(self, label):
-        """Find (r,c) in self.keypad_map whose value == label."""
-        for pos, val in self.keypad_map.items():
-            if val == label:
-                return pos
-        raise ValueError(f"Label {label!r} not found in this keypad.")
+def numeric_cost_array(depth: int, table=None):
+    """
+    numeric_cost_matrix() as a square array indexed by NUMERIC_LAYOUT.index:
+    arr[i, j] = presses to move from labels[i] to labels[j] and press it.
+    Falls back to an object array once the costs no longer fit in int64.
+    """
+    if table is None:
+        table = numeric_cost_matrix(depth)
+    n = len(NUMERIC_LAYOUT)
+    # Sums and products are range-checked where they are formed
+    fits = max(table.values()) <= INT64_MAX
+    arr = np.zeros((n, n), dtype=np.int64 if fits else object)
+    for (a, b), presses in table.items():
+        arr[NUMERIC_LAYOUT.index[a], NUMERIC_LAYOUT.index[b]] = presses
+    return arr
+
+
+def _code_matrix(codes):
+    """
+    Codes (all of the same length) as an (n, 1 + length) array of
+    NUMERIC_LAYOUT indices, with the starting 'A' prepended.
+    """
+    raw = np.asarray(codes, dtype="S")
+    if raw.ndim != 1:
+        raise ValueError("Expected a 1-D sequence of codes.")
+    width = raw.dtype.itemsize
+    chars = raw.view(np.uint8).reshape(len(raw), width)
 
+    lookup = np.full(256, -1, dtype=np.int64)
+    for label, i in NUMERIC_LAYOUT.index.items():
+        lookup[ord(label)] = i
+    idx = lookup[chars]
+    if (idx < 0).any():
+        raise ValueError("Codes must all have the same length and use keypad labels.")
 
-# ----------------------------------------------------------------------
-# 4) Build the 4-layer structure
-# ----------------------------------------------------------------------
+    start = np.full((len(raw), 1), NUMERIC_LAYOUT.index["A"], dtype=np.int64)
+    return np.hstack([start, idx]), chars
 
 
-def build_4_layer_structure():
+def batch_code_costs(codes, depth: int, costs=None):
     """
-    - layer_numeric: bottom-most numeric keypad
-    - layer3_dir: a directional keypad controlling the numeric keypad
-    - layer2_dir: a directional keypad controlling layer3_dir
-    - layer1_dir: a directional keypad controlling layer2_dir  (top-level)
+    Top-level presses for every code in `codes`: one gather over the
+    consecutive label pairs and a row sum.
     """
-    # bottom-most numeric keypad
-    numeric_map, numeric_start, numeric_adj = build_numeric_keypad()
-    layer_numeric = LayeredKeypadControl(
-        numeric_map, numeric_start, numeric_adj, parent=None
-    )  # temporarily no parent
+    if costs is None:
+        costs = numeric_cost_array(depth)
+    idx, _ = _code_matrix(codes)
+    return _code_presses(costs, idx)
+
+
+def _int64_or_object(arr, bound):
+    """`arr` as object ints when values up to `bound` would overflow int64."""
+    return arr.astype(object) if bound > INT64_MAX else arr
 
-    # 3rd-layer directional keypad
-    dir3_map, dir3_start, dir3_adj = build_directional_keypad()
-    layer3 = LayeredKeypadControl(dir3_map, dir3_start, dir3_adj, parent=layer_numeric)
 
-    # 2nd-layer directional keypad
-    dir2_map, dir2_start, dir2_adj = build_directional_keypad()
-    layer2 = LayeredKeypadControl(dir2_map, dir2_start, dir2_adj, parent=layer3)
+def _code_presses(costs, idx):
+    """Row sums of the pair costs, widened to object ints if they could overflow."""
+    max_cost = int(costs.max()) if costs.size else 0
+    costs = _int64_or_object(costs, max_cost * (idx.shape[1] - 1))
+    return costs[idx[:, :-1], idx[:, 1:]].sum(axis=1)
 
-    # 1st-layer directional keypad (top-level)
-    dir1_map, dir1_start, dir1_adj = build_directional_keypad()
-    layer1 = LayeredKeypadControl(dir1_map, dir1_start, dir1_adj, parent=layer2)
 
-    return layer1, layer2, layer3, layer_numeric
+def batch_complexities(codes, depth: int, costs=None):
+    """
+    Complexity (presses * numeric part) of every code in `codes`, which
+    are digit strings ending in 'A' like '029A'.
+
+    The int64 path is kept while max cost * code length * 10**digits fits,
+    otherwise the arithmetic is done on object ints.
+    """
+    if costs is None:
+        costs = numeric_cost_array(depth)
+    idx, chars = _code_matrix(codes)
+    digits = chars[:, :-1].astype(np.int64) - ord("0")
+    if ((digits < 0) | (digits > 9)).any() or (chars[:, -1] != ord("A")).any():
+        raise ValueError("Codes must be digits followed by a final 'A'.")
+
+    n_digits = digits.shape[1]
+    number_bound = 10**n_digits  # numeric parts are below this
+    dtype = object if number_bound > INT64_MAX else np.int64
+    powers = np.array([10**k for k in range(n_digits - 1, -1, -1)], dtype=dtype)
+    numbers = digits.astype(dtype) @ powers
+
+    presses = _code_presses(costs, idx)
+    max_cost = int(costs.max()) if costs.size else 0
+    bound = max_cost * idx.shape[1] * number_bound
+    return _int64_or_object(presses, bound) * _int64_or_object(numbers, bound)
 
 
 # ----------------------------------------------------------------------
-# 5) Typing a code on the numeric keypad, measuring top-level presses
+# 5) Counting optimal sequences with a (min, count) semiring
 # ----------------------------------------------------------------------
 
 
-def cost_to_type_code(layer_numeric: LayeredKeypadControl, code: str) -> int:
+def _all_transition_options(layout: KeypadLayout):
+    return {
+        (a, b): [transitions(m) for m in layout.all_minimal_moves(a, b)]
+        for a in layout.labels
+        for b in layout.labels
+    }
+
+
+def _count_ring(modulus=None, log2=False):
+    """
+    (one, mul, add) for counting optimal sequences: exact Python ints,
+    ints reduced modulo `modulus`, or log2 of the count as a float.
     """
-    Returns the *top-level* cost in button presses (the BFS distance in the topmost layer)
-    to type the given code (e.g. "029A") on the numeric keypad.
+    if log2:
+
+        def add(a, b):
+            hi, lo = max(a, b), min(a, b)
+            return hi + math.log2(1 + 2 ** (lo - hi))
 
-    Implementation approach (simplified):
-      - Start on numeric keypad's 'A' (the arm starts aimed at 'A').
-      - For each character c in code, do:
-          cost to move from current_char to c  (in top-level presses)
-          + cost to press c  (which is "move from c to 'A' on the numeric-layer"…
-                              but that itself is a press of 'A' on the 3rd-layer, etc.)
-        Actually, for the puzzle’s examples like "029A",
-        you typically do: move from 'A' to '0', press, move from '0' to '2', press, ...
-        In other words, the next “move from current_char to next_char” is on the numeric keypad,
-        so each step is turned into cost_of_move(...) at that numeric-layer,
-        but measured in top-level presses. Then cost_of_press_button(...) to press at that numeric-layer.
+        return 0.0, operator.add, add
+    if modulus:
+        return 1, lambda a, b: a * b % modulus, lambda a, b: (a + b) % modulus
+    return 1, operator.mul, operator.add
 
-    Because this puzzle’s sample solution sequences show the arm “stays” at the newly-pressed button after pressing.
-    So after pressing '0', the arm is physically over '0', so next we move from '0' to '2'.
+
+def _best_with_count(candidates, cost, count, ring):
+    """
+    (min, +) x (count) over candidate transition lists: the cheapest total
+    cost, and how many optimal sequences realise it in all (the products of
+    the counts along each cheapest candidate, summed).
+    """
+    one, mul, add = ring
+    best_cost = None
+    best_count = None
+    for trans in candidates:
+        total = 0
+        ways = one
+        for j in trans:
+            total += cost[j]
+            ways = mul(ways, count[j])
+        if best_cost is None or total < best_cost:
+            best_cost, best_count = total, ways
+        elif total == best_cost:
+            best_count = add(best_count, ways)
+    return best_cost, best_count
+
+
+def directional_cost_count_matrix(depth, modulus=None, log2=False):
     """
-    # In practice, we want layer_numeric to have a parent=layer3, which has parent=layer2, which has parent=layer1.
-    # Then every cost_of_move(...) or cost_of_press_button(...) is computed up the chain.
+    Like directional_cost_matrix(), plus count[i]: the number of distinct
+    minimal human sequences achieving cost[i].
 
-    pos_order = list(code)  # e.g. ['0','2','9','A']
+    Counts multiply along every press of every layer, so their size grows
+    ~2.5x per robot: exact ints are fine up to ~15 robots, but at 25 the
+    count has ~10^10 bits. Pass `modulus` for the count modulo a number, or
+    log2=True for its base-2 logarithm as a float.
+    """
+    ring = _count_ring(modulus, log2)
+    all_options = _all_transition_options(DIRECTIONAL_LAYOUT)
+    options = [all_options[(a, b)] for a in DIR_KEYS for b in DIR_KEYS]
+    cost = [1] * (N_DIR * N_DIR)
+    count = [ring[0]] * (N_DIR * N_DIR)
+    for _ in range(depth):
+        pairs = [
+            _best_with_count(candidates, cost, count, ring) for candidates in options
+        ]
+        cost = [c for c, _ in pairs]
+        count = [n for _, n in pairs]
+    return cost, count
+
+
+def numeric_cost_count_matrix(depth, modulus=None, log2=False):
+    """
+    {(from_label, to_label): (presses, number of optimal sequences)} for
+    the numeric keypad driven through `depth` directional robots.
+    """
+    ring = _count_ring(modulus, log2)
+    cost, count = directional_cost_count_matrix(depth, modulus, log2)
+    return {
+        pair: _best_with_count(candidates, cost, count, ring)
+        for pair, candidates in _all_transition_options(NUMERIC_LAYOUT).items()
+    }
 
-    # The arm starts at 'A' on numeric
-    current_char = "A"
-    total_top_cost = 0
 
-    for c in pos_order:
-        # move
-        mv = layer_numeric.cost_of_move(current_char, c)
-        # press
-        #   Actually pressing c means physically pressing 'A' on the numeric-layer’s controlling keypad
-        #   but conceptually we call layer_numeric.cost_of_press_button(c).
-        #   That function is written as if we are pressing the "button c" itself,
-        #   but on a real numeric keypad pressing "button c" is immediate.
-        #
-        #   A simpler approach: "To press c, we do 1 'A' press on the 3rd-layer."
-        #   But we often want the BFS approach: move from c to c?  distance=0. press => +1
-        #   So cost_of_press_button(c) => cost_of_move(c, 'A')+1 ? That’s not quite right for the numeric keypad if c != 'A'.
-        #
-        #   For *this puzzle’s statements*, you press the numeric keypad’s “c” by physically pushing it.
-        #   The controlling directional keypad button is 'A'.
-        #   So to press "c", the numeric-layer’s arm is already at "c".  We want to press "c" in real life => that’s cost_of_press_button(...) with current_button=c.
+def code_cost_count(code: str, depth: int, modulus=None, log2=False, table=None):
+    """
+    (presses, number of distinct optimal top-level sequences) to type
+    `code` through `depth` directional robots. See
+    directional_cost_count_matrix() for `modulus` and `log2`.
+    """
+    if table is None:
+        table = numeric_cost_count_matrix(depth, modulus, log2)
+    one, mul, _ = _count_ring(modulus, log2)
+    keys = "A" + code
+    presses = 0
+    ways = one
+    for pair in zip(keys, keys[1:]):
+        c, n = table[pair]
+        presses += c
+        ways = mul(ways, n)
+    return presses, ways
 
-        pr = layer_numeric.cost_of_press_button(c)
 
-        total_top_cost += mv + pr
-        # after pressing c, the numeric arm remains over c
-        current_char = c
+# ----------------------------------------------------------------------
+# 6) Run-length-encoded verification of press sequences
+# ----------------------------------------------------------------------
+
 
-    return total_top_cost
+def run_length_encode(sequence: str) -> list[tuple[str, int]]:
+    """'<<vA' -> [('<', 2), ('v', 1), ('A', 1)]"""
+    runs = []
+    for key in sequence:
+        if runs and runs[-1][0] == key:
+            runs[-1] = (key, runs[-1][1] + 1)
+        else:
+            runs.append((key, 1))
+    return runs
+
+
+def run_length_decode(runs) -> str:
+    return "".join(key * count for key, count in runs)
+
+
+def simulate_runs(runs, layouts):
+    """
+    Pushes a run-length-encoded press sequence through keypad `layouts`
+    (the first one is pressed directly, each output feeds the next), every
+    arm starting on 'A'. Returns the last layer's output as runs.
+
+    A run of n moves is checked against the layout's reach table in one
+    step, and a run of n 'A' presses emits one run of n labels, so the work
+    is proportional to the number of runs, not presses.
+    Raises ValueError if an arm would aim at a gap.
+    """
+    for level, layout in enumerate(layouts):
+        label = "A"
+        output = []
+        for key, count in runs:
+            if key == "A":
+                if output and output[-1][0] == label:
+                    output[-1] = (label, output[-1][1] + count)
+                else:
+                    output.append((label, count))
+            elif key in MOVE_STEPS:
+                if count > layout.reach[(label, key)]:
+                    raise ValueError(
+                        f"Layer {level}: {count} x {key!r} from {label!r} aims at a gap."
+                    )
+                (r, c), (dr, dc) = layout.positions[label], MOVE_STEPS[key]
+                label = layout.keypad_map[(r + dr * count, c + dc * count)]
+            else:
+                raise ValueError(f"Layer {level}: unknown key {key!r}.")
+        runs = output
+    return runs
+
+
+def verify_runs(runs, code: str, depth: int) -> bool:
+    """
+    True if the run-length-encoded top-level sequence `runs`, typed through
+    `depth` directional robots, makes the numeric keypad type `code`.
+    """
+    layouts = [DIRECTIONAL_LAYOUT] * depth + [NUMERIC_LAYOUT]
+    try:
+        output = simulate_runs(runs, layouts)
+    except ValueError:
+        return False
+    return output == run_length_encode(code)
 
 
 # ----------------------------------------------------------------------
-# 6) Putting it all together for part1
+# 7) Putting it all together
 # ----------------------------------------------------------------------
 
 
-def part1(codes: list[str]) -> int:
+def numeric_part(code: str) -> int:
+    """
+    The numeric part of the code ignoring leading zeros & trailing 'A',
+    e.g. '029A' => 29, '980A' => 980.
+    """
+    numeric_part_str = code[:-1].lstrip("0")
+    return int(numeric_part_str) if numeric_part_str else 0
+
+
+def total_complexity(codes: list[str], depth: int, cache_dir=None) -> int:
+    """
+    Sum of complexities (presses * numeric part) with `depth` directional
+    robots between the human and the numeric keypad. With `cache_dir`, the
+    cost table goes through cached_cost_tables().
+    """
+    if cache_dir:
+        table = cached_cost_tables(depth, cache_dir)[1]
+    else:
+        table = numeric_cost_matrix(depth)
+    return sum(code_cost(code, depth, table) * numeric_part(code) for code in codes)
+
+
+def part1(codes: list[str], cache_dir=None) -> int:
     """
     Given the 5 (or more) codes in the puzzle input, compute the sum of complexities.
     Complexity of one code = (top-level presses to type it) * (numeric portion ignoring leading zeros).
+    Two robots on directional keypads sit between us and the numeric keypad.
     """
-    # Build the 4-layer structure once
-    layer1, layer2, layer3, layer_numeric = build_4_layer_structure()
-
-    total = 0
-    for code in codes:
-        top_cost = cost_to_type_code(layer_numeric, code)
-        # parse the numeric portion ignoring leading zeros & trailing 'A'
-        # puzzle states "The numeric part of the code (ignoring leading zeroes)";
-        # e.g. '029A' => 29, '980A' => 980, etc.
-        # Typically these codes always end with 'A', so do code[:-1] then int(., base=10).
-        numeric_part_str = code[:-1].lstrip(
-            "0"
-        )  # remove trailing 'A' and leading zeros
-        if not numeric_part_str:
-            numeric_part = 0
-        else:
-            numeric_part = int(numeric_part_str)
+    return total_complexity(codes, 2, cache_dir)
 
-        complexity = top_cost * numeric_part
-        total += complexity
 
-    return total
+def part2(codes: list[str], cache_dir=None) -> int:
+    """
+    Same as part1, but with 25 robots on directional keypads.
+    """
+    return total_complexity(codes, 25, cache_dir)
 
 
 def main():
     data = read_data("21.txt")
-    answer = part1(data)
-    print(answer)
+    answer1 = part1(data, CACHE_DIR)
+    print(answer1)
+    answer2 = part2(data, CACHE_DIR)
+    print(answer2)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,4 @@
-from typing import List, Tuple, Dict
+from typing import Callable, List, Tuple, Dict
 from itertools import product
 from functools import lru_cache
 
@@ -27,7 +27,22 @@ def next_secret(secret: int) -> int:
     return secret
 
 
-def get_price_sequence(initial: int, n: int = 2000) -> Tuple[List[int], List[int]]:
+def table_next_secret(table) -> Callable[[int], int]:
+    """
+    next_secret() backed by a transition table instead of the unbounded
+    lru_cache, e.g. the memory-mapped day_22_o1.transition_table():
+    each step is a single array read.
+    """
+
+    def step(secret: int) -> int:
+        return int(table[secret])
+
+    return step
+
+
+def get_price_sequence(
+    initial: int, n: int = 2000, step: Callable[[int], int] = next_secret
+) -> Tuple[List[int], List[int]]:
     """Generate sequence of prices and their changes."""
     prices = []
     secret = initial
@@ -35,7 +50,7 @@ def get_price_sequence(initial: int, n: int = 2000) -> Tuple[List[int], List[int
     # Pre-generate all secrets and prices
     for _ in range(n + 1):  # +1 for initial price
         prices.append(secret % 10)
-        secret = next_secret(secret)
+        secret = step(secret)
 
     # Calculate changes
     changes = [prices[i + 1] - prices[i] for i in range(n)]
@@ -81,16 +96,20 @@ def find_best_pattern(
     return best_pattern, max_bananas
 
 
-def part1(initial_secrets: List[int], n: int = 2000) -> int:
+def part1(
+    initial_secrets: List[int], n: int = 2000, step: Callable[[int], int] = next_secret
+) -> int:
     """Calculate the sum of the nth secret number for each initial secret."""
-    return sum(generate_nth_secret(initial, n) for initial in initial_secrets)
+    return sum(generate_nth_secret(initial, n, step) for initial in initial_secrets)
 
 
-def part2(initial_secrets: List[int], n: int = 2000) -> int:
+def part2(
+    initial_secrets: List[int], n: int = 2000, step: Callable[[int], int] = next_secret
+) -> int:
     """Find the maximum number of bananas possible."""
     # Pre-compute all sequences
     sequences_dict = {
-        initial: get_price_sequence(initial, n) for initial in initial_secrets
+        initial: get_price_sequence(initial, n, step) for initial in initial_secrets
     }
 
     best_pattern, max_bananas = find_best_pattern(sequences_dict)
@@ -98,11 +117,13 @@ def part2(initial_secrets: List[int], n: int = 2000) -> int:
     return max_bananas
 
 
-def generate_nth_secret(initial: int, n: int) -> int:
+def generate_nth_secret(
+    initial: int, n: int, step: Callable[[int], int] = next_secret
+) -> int:
     """Generate the nth secret number in the sequence."""
     secret = initial
     for _ in range(n):
-        secret = next_secret(secret)
+        secret = step(secret)
     return secret
 
 
@@ -1,3 +1,14 @@
+from collections import defaultdict
+from functools import lru_cache
+import heapq
+from multiprocessing import Pool
+import os
+
+import numpy as np
+
+MOD_MASK = 0xFFFFFF
+
+
 def read_data():
     """
     Reads each line from '21.txt', returning a list of initial secret numbers (integers).
@@ -19,8 +30,6 @@ def evolve(secret):
       3) secret = (secret XOR (secret*2048))& 0xFFFFFF
     Returns the new secret.
     """
-    MOD_MASK = 0xFFFFFF
-
     # Step 1
     secret ^= secret << 6
     secret &= MOD_MASK
@@ -57,6 +66,330 @@ def generate_prices(initial_secret, length=2000):
     return prices
 
 
+def _evolve_inplace(secrets, scratch):
+    """
+    evolve() applied to every element of the uint32 array `secrets`, in
+    place. `scratch` is a same-shaped uint32 buffer, so no temporaries are
+    allocated. Bits shifted past 32 are above the 24-bit mask anyway.
+    """
+    np.left_shift(secrets, 6, out=scratch)
+    secrets ^= scratch
+    secrets &= MOD_MASK
+    np.right_shift(secrets, 5, out=scratch)
+    secrets ^= scratch
+    np.left_shift(secrets, 11, out=scratch)
+    secrets ^= scratch
+    secrets &= MOD_MASK
+
+
+def evolve_batch(buyers, steps=2000):
+    """
+    Evolves all buyers' secrets `steps` times at once, as a uint32 array.
+    Returns the array of final secrets.
+    """
+    secrets = np.array(buyers, dtype=np.uint32)
+    scratch = np.empty_like(secrets)
+    for _ in range(steps):
+        _evolve_inplace(secrets, scratch)
+    return secrets
+
+
+def price_matrix(buyers, length=2000):
+    """
+    Batch version of generate_prices(): a (length+1) x len(buyers) uint8
+    matrix whose column b holds the prices of buyer b, row 0 being the
+    price of the initial secret.
+    """
+    secrets = np.array(buyers, dtype=np.uint32)
+    scratch = np.empty_like(secrets)
+    prices = np.empty((length + 1, len(secrets)), dtype=np.uint8)
+    np.remainder(secrets, 10, out=scratch)
+    prices[0] = scratch
+    for t in range(1, length + 1):
+        _evolve_inplace(secrets, scratch)
+        np.remainder(secrets, 10, out=scratch)
+        prices[t] = scratch
+    return prices
+
+
+# ----------------------------------------------------------------------
+# GF(2) jump-ahead: evolve() is linear over 24-bit vectors
+# ----------------------------------------------------------------------
+
+SECRET_BITS = 24
+MAX_JUMP_BITS = 64  # jumps up to 2**64 - 1 steps
+
+
+def _apply(columns, secret):
+    """Matrix (given by its 24 column images) times the bit-vector `secret`."""
+    out = 0
+    i = 0
+    while secret:
+        if secret & 1:
+            out ^= columns[i]
+        secret >>= 1
+        i += 1
+    return out
+
+
+def _compose(a, b):
+    """Columns of the matrix product a @ b (apply b, then a)."""
+    return [_apply(a, col) for col in b]
+
+
+def _byte_tables(columns):
+    """
+    Three 256-entry tables, one per input byte, so that applying the matrix
+    to x is t0[x & 255] ^ t1[(x >> 8) & 255] ^ t2[x >> 16].
+    """
+    tables = []
+    for shift in (0, 8, 16):
+        table = [0] * 256
+        for byte in range(1, 256):
+            low = byte & -byte
+            table[byte] = table[byte ^ low] ^ columns[shift + low.bit_length() - 1]
+        tables.append(table)
+    return tables
+
+
+@lru_cache(maxsize=None)
+def _power_tables():
+    """Byte tables of M**(2**k) for k < MAX_JUMP_BITS, M being evolve()."""
+    columns = [evolve(1 << i) for i in range(SECRET_BITS)]
+    powers = []
+    for _ in range(MAX_JUMP_BITS):
+        powers.append(_byte_tables(columns))
+        columns = _compose(columns, columns)
+    return powers
+
+
+def jump_matrix(n):
+    """Columns of M**n, i.e. of evolving n times."""
+    columns = [1 << i for i in range(SECRET_BITS)]
+    for k, (t0, t1, t2) in enumerate(_power_tables()):
+        if n >> k & 1:
+            columns = [t0[c & 255] ^ t1[(c >> 8) & 255] ^ t2[c >> 16] for c in columns]
+    return columns
+
+
+def jump(secret, n):
+    """
+    The secret after n evolve() steps, in O(log n) table lookups. Like
+    evolve(), only the low 24 bits of `secret` are used.
+    """
+    if not 0 <= n < 1 << MAX_JUMP_BITS:
+        raise ValueError(f"Jump length must be in [0, 2**{MAX_JUMP_BITS}).")
+    secret &= MOD_MASK
+    for k, (t0, t1, t2) in enumerate(_power_tables()):
+        if n >> k & 1:
+            secret = t0[secret & 255] ^ t1[(secret >> 8) & 255] ^ t2[secret >> 16]
+    return secret
+
+
+def _jump_arrays(n):
+    """The byte tables of M**n as uint32 arrays, for vectorized jumps."""
+    if not 0 <= n < 1 << MAX_JUMP_BITS:
+        raise ValueError(f"Jump length must be in [0, 2**{MAX_JUMP_BITS}).")
+    return [np.array(table, dtype=np.uint32) for table in _byte_tables(jump_matrix(n))]
+
+
+def _apply_arrays(tables, secrets):
+    t0, t1, t2 = tables
+    return t0[secrets & 255] ^ t1[(secrets >> 8) & 255] ^ t2[secrets >> 16]
+
+
+def jump_batch(secrets, n):
+    """
+    jump() applied to every seed in `secrets`: M**n is built once, then
+    applied to the whole uint32 array with three byte-table gathers.
+    """
+    secrets = np.asarray(secrets, dtype=np.uint32) & MOD_MASK
+    return _apply_arrays(_jump_arrays(n), secrets)
+
+
+# ----------------------------------------------------------------------
+# Memory-mapped transition tables over all 2**24 secrets
+# ----------------------------------------------------------------------
+
+TABLE_DIR = "22_cache"
+N_SECRETS = 1 << SECRET_BITS
+
+
+def _cached_array(path, build):
+    """
+    Memory-maps the uint32 .npy array of N_SECRETS entries at `path`
+    read-only, building and saving it with build() first if the file is
+    missing or has the wrong shape or dtype.
+    """
+    try:
+        table = np.load(path, mmap_mode="r")
+        if table.shape == (N_SECRETS,) and table.dtype == np.uint32:
+            return table
+    except (OSError, ValueError):
+        pass
+
+    table = build()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+    np.save(tmp_path, table)
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r")
+
+
+def transition_table(k=1, cache_dir=TABLE_DIR):
+    """
+    next**k as a read-only memory-mapped uint32 array of 2**24 entries
+    (64 MB): table[s] is the secret k evolve() steps after s.
+
+    Built once with jump_batch() and saved as .npy in `cache_dir`; later
+    calls, from any process, map the same file so the pages are shared
+    through the OS page cache. A file of the wrong shape or dtype is rebuilt.
+    """
+    return _cached_array(
+        os.path.join(cache_dir, f"next_{k}.npy"),
+        lambda: jump_batch(np.arange(N_SECRETS, dtype=np.uint32), k),
+    )
+
+
+# ----------------------------------------------------------------------
+# Orbit-aware sharing of price streams
+# ----------------------------------------------------------------------
+
+# evolve() is a single cycle through every non-zero secret (0 maps to 0)
+ORBIT_LENGTH = N_SECRETS - 1
+
+
+def _build_orbit_positions(block=4096):
+    """
+    pos[s] = k with s == jump(1, k): the orbit is walked `block` states at
+    a time, each block being the previous one jumped `block` steps ahead.
+    """
+    positions = np.zeros(N_SECRETS, dtype=np.uint32)
+    base = np.empty(block, dtype=np.uint32)
+    secret = 1
+    for i in range(block):
+        base[i] = secret
+        secret = evolve(secret)
+    stride = _jump_arrays(block)
+    offsets = np.arange(block, dtype=np.uint32)
+    for start in range(0, ORBIT_LENGTH, block):
+        n = min(block, ORBIT_LENGTH - start)
+        positions[base[:n]] = start + offsets[:n]
+        base = _apply_arrays(stride, base)
+    return positions
+
+
+def orbit_positions(cache_dir=TABLE_DIR):
+    """
+    Memory-mapped discrete-log table of the orbit: pos[s] is how many
+    evolve() steps after 1 the secret s comes (pos[0] is meaningless).
+    """
+    return _cached_array(
+        os.path.join(cache_dir, "orbit_positions.npy"), _build_orbit_positions
+    )
+
+
+def orbit_segments(buyers, length=2000, positions=None):
+    """
+    Groups buyers whose seeds lie within `length` steps of each other on
+    the orbit, as (head_secret, span, members) with members a list of
+    (buyer index, offset from head). One stream of span + length steps from
+    head_secret covers every member's `length` steps.
+    """
+    if positions is None:
+        positions = orbit_positions()
+    seeds = np.array(buyers, dtype=np.uint32)
+    segments = []
+
+    zero = np.flatnonzero(seeds == 0)
+    if len(zero):
+        segments.append((0, 0, [(int(b), 0) for b in zero]))
+
+    nonzero = np.flatnonzero(seeds != 0)
+    if not len(nonzero):
+        return segments
+    pos = positions[seeds[nonzero]].astype(np.int64)
+    order = np.argsort(pos, kind="stable")
+    pos = pos[order]
+    index = nonzero[order]
+
+    # Start right after the largest cyclic gap, so no segment wraps around
+    gaps = np.diff(pos, append=pos[0] + ORBIT_LENGTH)
+    first = (int(np.argmax(gaps)) + 1) % len(pos)
+    pos = np.roll(pos, -first)
+    index = np.roll(index, -first)
+    pos = (pos - pos[0]) % ORBIT_LENGTH
+
+    breaks = np.flatnonzero(np.diff(pos) > length) + 1
+    for lo, hi in zip([0, *breaks], [*breaks, len(pos)]):
+        head = int(seeds[index[lo]])
+        members = [(int(b), int(p - pos[lo])) for b, p in zip(index[lo:hi], pos[lo:hi])]
+        segments.append((head, members[-1][1], members))
+    return segments
+
+
+def orbit_price_streams(buyers, length=2000, positions=None):
+    """
+    Same as [generate_prices(b, length) for b in buyers], but every orbit
+    segment (see orbit_segments()) is generated once and its members get
+    slices of it, so overlapping buyers share their evolve() steps.
+    """
+    streams = [None] * len(buyers)
+    for head, span, members in orbit_segments(buyers, length, positions):
+        prices = generate_prices(head, span + length)
+        for b, offset in members:
+            streams[b] = prices[offset : offset + length + 1]
+    return streams
+
+
+# ----------------------------------------------------------------------
+# Backward queries: the inverse of evolve()
+# ----------------------------------------------------------------------
+
+
+def unevolve(secret):
+    """
+    Inverse of evolve(): undoes its three xorshift steps in reverse order.
+    x ^= x << s is inverted by x ^= x << s, then x << 2s, x << 4s, ... until
+    the shift passes the 24 bits (likewise for >>), since
+    (I + S)(I + S**2)(I + S**4)... = I + S + S**2 + ... = (I + S)**-1.
+    """
+    # Undo step 3
+    secret ^= secret << 11
+    secret ^= secret << 22
+    secret &= MOD_MASK
+
+    # Undo step 2
+    secret ^= secret >> 5
+    secret ^= secret >> 10
+    secret ^= secret >> 20
+
+    # Undo step 1
+    secret ^= secret << 6
+    secret ^= secret << 12
+    secret &= MOD_MASK
+
+    return secret
+
+
+def previous_secret(secret, k=1):
+    """
+    The secret k evolve() steps before `secret`, for any k >= 0, in
+    O(log k) table lookups: as M**ORBIT_LENGTH is the identity, going back
+    k steps is jumping ahead (-k) % ORBIT_LENGTH steps.
+    """
+    if k < 0:
+        raise ValueError("Step count must be non-negative.")
+    return jump(secret, -k % ORBIT_LENGTH)
+
+
+def previous_secret_batch(secrets, k=1):
+    """previous_secret() applied to every secret of `secrets`, as uint32."""
+    if k < 0:
+        raise ValueError("Step count must be non-negative.")
+    return jump_batch(secrets, -k % ORBIT_LENGTH)
+
+
 def build_pattern_dict(prices):
     """
     Given a list of prices (length = 2001 if we generate 2000 new secrets),
@@ -86,46 +419,324 @@ def build_pattern_dict(prices):
     return pattern_dict
 
 
-def part1(buyers):
+# ----------------------------------------------------------------------
+# Dense 19**4 pattern accumulator
+# ----------------------------------------------------------------------
+
+N_DELTAS = 19  # a price change is in -9..9
+N_PATTERNS = N_DELTAS**4
+
+
+def encode_pattern(pattern):
+    """(d0, d1, d2, d3) -> base-19 integer key in [0, 19**4)."""
+    key = 0
+    for delta in pattern:
+        key = key * N_DELTAS + delta + 9
+    return key
+
+
+def decode_pattern(key):
+    """Inverse of encode_pattern()."""
+    pattern = []
+    for _ in range(4):
+        key, digit = divmod(key, N_DELTAS)
+        pattern.append(digit - 9)
+    return tuple(reversed(pattern))
+
+
+def pattern_bananas(buyers, length=2000):
     """
-    Same as before: for each buyer, evolve the secret 2000 times
-    and sum the final secrets.
+    bananas[key] = total sold over all buyers with the pattern encode_pattern()
+    maps to `key`, in a flat 19**4 list.
+
+    Each buyer's change window is rolled into its base-19 key as prices are
+    generated. seen[key] holds the index of the last buyer that sold on that
+    key, so a buyer's first occurrence is `seen[key] != b` and nothing is
+    cleared between buyers.
     """
-    total = 0
-    for s in buyers:
-        for _ in range(2000):
-            s = evolve(s)
-        total += s
-    return total
+    bananas = [0] * N_PATTERNS
+    seen = [-1] * N_PATTERNS
+    for b, secret in enumerate(buyers):
+        prev = secret % 10
+        key = 0
+        for i in range(1, length + 1):
+            secret = evolve(secret)
+            price = secret % 10
+            key = (key * N_DELTAS + price - prev + 9) % N_PATTERNS
+            prev = price
+            if i >= 4 and seen[key] != b:
+                seen[key] = b
+                bananas[key] += price
+    return bananas
+
+
+def window_keys(prices):
+    """
+    Base-19 keys of every 4-change window of a price_matrix(): row t of the
+    result is the window ending with the change into prices[t + 4].
+    """
+    deltas = np.diff(prices.astype(np.int32), axis=0) + 9
+    return (
+        deltas[:-3] * N_DELTAS**3
+        + deltas[1:-2] * N_DELTAS**2
+        + deltas[2:-1] * N_DELTAS
+        + deltas[3:]
+    )
 
 
-def part2(buyers):
+def pattern_bananas_matrix(prices, chunk=128):
     """
-    For Part 2:
-      1) For each buyer, generate 2001 prices (the ones digit of each secret).
-      2) Build a dictionary mapping 4-change-pattern -> earliest sale price.
-      3) Combine all buyers' dictionaries to find which single 4-change-pattern
-         yields the maximum total bananas (sum of earliest sale prices from each buyer).
+    Vectorized pattern_bananas() over a price_matrix(), as an int64 array.
+
+    Buyers are taken `chunk` columns at a time; the stamp array has one
+    19**4 block per column and stores the chunk number that last saw each
+    (column, key), so first occurrences are found one time step at a time
+    across the whole chunk, again without clearing. The sale prices of the
+    first occurrences are then summed per key in one scatter-add. Window keys
+    are built one chunk at a time too, so beyond the uint8 price matrix only
+    a chunk's worth of int32 keys is ever held.
+    """
+    sales = prices[4:]
+    n_windows, n_buyers = sales.shape
+
+    bananas = np.zeros(N_PATTERNS, dtype=np.int64)
+    stamps = np.full(chunk * N_PATTERNS, -1, dtype=np.int32)
+    first = np.empty((n_windows, min(chunk, n_buyers)), dtype=bool)
+    for epoch, lo in enumerate(range(0, n_buyers, chunk)):
+        block = window_keys(prices[:, lo : lo + chunk])
+        width = block.shape[1]
+        slots = np.arange(width) * N_PATTERNS
+        for t in range(n_windows):
+            ids = slots + block[t]
+            first[t, :width] = stamps[ids] != epoch
+            stamps[ids] = epoch
+        mask = first[:, :width]
+        # Same as np.add.at(bananas, keys, prices), but much faster
+        bananas += np.bincount(
+            block[mask],
+            weights=sales[:, lo : lo + chunk][mask],
+            minlength=N_PATTERNS,
+        ).astype(np.int64)
+    return bananas
+
+
+# ----------------------------------------------------------------------
+# Top-k patterns with per-buyer contributions
+# ----------------------------------------------------------------------
+
+
+def top_keys(totals, k):
+    """
+    The k (key, total) pairs with the largest totals, best first, from a
+    dense array/list or a {key: total} dict. The totals are streamed through
+    a bounded k-element heap; ties go to the smaller key. k <= 0 gives [].
     """
-    from collections import defaultdict
+    if k <= 0:
+        return []
+    items = totals.items() if isinstance(totals, dict) else enumerate(totals)
+    heap = []
+    for key, total in items:
+        entry = (int(total), -key)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+    return [(-neg_key, total) for total, neg_key in sorted(heap, reverse=True)]
+
+
+def pattern_contributions(buyers, keys, length=2000):
+    """
+    contributions[key] = [(buyer, sale index, price), ...] for each of `keys`:
+    the buyers that sell on that pattern, where, and for how much. The sale
+    index counts prices as generate_prices() does (the 4th change sells at 4).
 
-    # Build an aggregated mapping from pattern -> sum of earliest sale prices over ALL buyers
-    aggregator = defaultdict(int)
+    This is the second, targeted pass of top_patterns(): the same rolling
+    base-19 key as pattern_bananas(), but only the wanted keys are looked at.
+    """
+    wanted = set(keys)
+    contributions = {key: [] for key in wanted}
+    seen = {key: -1 for key in wanted}
+    for b, secret in enumerate(buyers):
+        prev = secret % 10
+        key = 0
+        for i in range(1, length + 1):
+            secret = evolve(secret)
+            price = secret % 10
+            key = (key * N_DELTAS + price - prev + 9) % N_PATTERNS
+            prev = price
+            if i >= 4 and key in wanted and seen[key] != b:
+                seen[key] = b
+                contributions[key].append((b, i, price))
+    return contributions
+
+
+def top_patterns(buyers, k=10, length=2000, processes=None):
+    """
+    Report of the k best selling patterns, best first, as a list of
+    (pattern, total bananas, [(buyer, sale index, price), ...]).
 
-    for initial_secret in buyers:
-        # 1) Generate the buyer's 2001 prices
-        prices = generate_prices(initial_secret, length=2000)
+    Pass 1 aggregates every pattern into the dense 19**4 array (in a process
+    pool with `processes`, for the puzzle's 2000 steps) and keeps the k best
+    through top_keys(); pass 2 re-runs the buyers once, recording
+    contributions for those k keys only.
+    """
+    if processes and length == 2000:
+        bananas = map_reduce_buyers(buyers, 2, processes)
+    else:
+        bananas = pattern_bananas_matrix(price_matrix(buyers, length))
+    winners = top_keys(bananas, k)
+    contributions = pattern_contributions(buyers, [key for key, _ in winners], length)
+    return [(decode_pattern(key), total, contributions[key]) for key, total in winners]
 
-        # 2) Build that buyer's pattern dictionary
-        buyer_dict = build_pattern_dict(prices)
 
-        # 3) Merge into the aggregator
-        for pattern, sale_price in buyer_dict.items():
-            aggregator[pattern] += sale_price
+# ----------------------------------------------------------------------
+# Generalized window length and price base
+# ----------------------------------------------------------------------
 
-    # The puzzle asks for the maximum sum we can get if we pick the best 4-change pattern
-    max_bananas = max(aggregator.values()) if aggregator else 0
-    return max_bananas
+DENSE_PATTERN_LIMIT = 1 << 22  # dense arrays up to 4M keys, hash table beyond
+
+
+def pattern_key_space(window=4, base=10):
+    """Number of distinct windows of `window` changes of prices mod `base`."""
+    return (2 * base - 1) ** window
+
+
+def decode_window(key, window=4, base=10):
+    """Base-(2*base - 1) key -> tuple of `window` price changes."""
+    radix = 2 * base - 1
+    pattern = []
+    for _ in range(window):
+        key, digit = divmod(key, radix)
+        pattern.append(digit - (base - 1))
+    return tuple(reversed(pattern))
+
+
+def generalized_pattern_bananas(
+    buyers, window=4, base=10, length=2000, dense_limit=DENSE_PATTERN_LIMIT
+):
+    """
+    pattern_bananas() for prices `secret % base` and windows of `window`
+    changes. Each window is rolled into a base-(2*base - 1) integer key.
+
+    The backend is picked from the key space (2*base - 1)**window: up to
+    `dense_limit` keys, totals and "last buyer seen" stamps are flat lists;
+    beyond that (e.g. 8 changes of base-10 prices, ~1.7e10 keys) they are
+    dicts over the packed int keys, holding only windows that occur.
+    Returns the totals list or dict; decode keys with decode_window().
+    """
+    radix = 2 * base - 1
+    space = pattern_key_space(window, base)
+    if space >= 1 << 63:
+        raise ValueError("Window keys must fit in 63 bits.")
+
+    if space <= dense_limit:
+        totals = [0] * space
+        seen = [-1] * space
+        last_seen = seen.__getitem__
+    else:
+        totals = defaultdict(int)
+        seen = {}
+        last_seen = lambda key: seen.get(key, -1)  # noqa: E731
+
+    for b, secret in enumerate(buyers):
+        prev = secret % base
+        key = 0
+        for i in range(1, length + 1):
+            secret = evolve(secret)
+            price = secret % base
+            key = (key * radix + price - prev + base - 1) % space
+            prev = price
+            if i >= window and last_seen(key) != b:
+                seen[key] = b
+                totals[key] += price
+    return totals if space <= dense_limit else dict(totals)
+
+
+def best_window(totals, window=4, base=10):
+    """(pattern, bananas) of the best key in generalized_pattern_bananas()."""
+    if isinstance(totals, dict):
+        key = max(totals, key=totals.__getitem__, default=0)
+        best = totals.get(key, 0)
+    else:
+        key = max(range(len(totals)), key=totals.__getitem__)
+        best = totals[key]
+    return decode_window(key, window, base), best
+
+
+# ----------------------------------------------------------------------
+# Process-pool map-reduce over buyers
+# ----------------------------------------------------------------------
+
+
+def _chunk_partial(chunk, part):
+    """
+    Worker: `chunk` is the raw bytes of a uint32 array of secrets. Returns
+    the partial part-1 sum as an int, or the partial 19**4 banana counts
+    as raw int64 bytes for part 2.
+    """
+    buyers = np.frombuffer(chunk, dtype=np.uint32)
+    if part == 1:
+        return int(jump_batch(buyers, 2000).sum(dtype=np.uint64))
+    return pattern_bananas_matrix(price_matrix(buyers, 2000)).tobytes()
+
+
+def _tree_reduce(partials):
+    """Pairwise sums, level by level, of ints or NumPy arrays."""
+    while len(partials) > 1:
+        paired = [a + b for a, b in zip(partials[::2], partials[1::2])]
+        if len(partials) % 2:
+            paired.append(partials[-1])
+        partials = paired
+    return partials[0]
+
+
+def map_reduce_buyers(buyers, part, processes=None, chunk_size=None):
+    """
+    Splits the buyers into uint32 chunks, has a process pool compute each
+    chunk's partial result (see _chunk_partial()) and tree-reduces them.
+    Returns the part-1 total, or the int64 banana array for part 2.
+    """
+    secrets = np.array(buyers, dtype=np.uint32)
+    processes = processes or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(secrets) // (4 * processes)))
+    chunks = [
+        (secrets[lo : lo + chunk_size].tobytes(), part)
+        for lo in range(0, len(secrets), chunk_size)
+    ]
+    if not chunks:
+        return 0 if part == 1 else np.zeros(N_PATTERNS, dtype=np.int64)
+
+    with Pool(processes) as pool:
+        partials = pool.starmap(_chunk_partial, chunks)
+    if part == 2:
+        partials = [np.frombuffer(p, dtype=np.int64) for p in partials]
+    return _tree_reduce(partials)
+
+
+def part1(buyers, processes=None):
+    """
+    Same as before: for each buyer, evolve the secret 2000 times
+    and sum the final secrets (all buyers at once, see jump_batch()).
+    With `processes`, the buyers are split across a process pool.
+    """
+    if processes:
+        return map_reduce_buyers(buyers, 1, processes)
+    return int(jump_batch(buyers, 2000).sum(dtype=np.uint64))
+
+
+def part2(buyers, processes=None):
+    """
+    For Part 2:
+      1) Generate 2001 prices (the ones digit of each secret) for all buyers at once.
+      2) Encode every 4-change window as a base-19 key and sum, per key, each
+         buyer's earliest sale price into a dense 19**4 array.
+      3) The best single pattern is the maximum of that array.
+    With `processes`, step 1-2 run per chunk of buyers in a process pool.
+    """
+    if processes:
+        return int(map_reduce_buyers(buyers, 2, processes).max())
+    return int(pattern_bananas_matrix(price_matrix(buyers, 2000)).max())
 
 
 def main():
@@ -1,4 +1,4 @@
-import itertools
+from day_23_o1 import iter_k_cliques, maximum_clique
 
 
 def read_data(filename):
@@ -13,40 +13,24 @@ def read_data(filename):
     return connections
 
 
-def part1(connections):
-    """Finds sets of three interconnected computers and counts those with 't'."""
-    computers = set()
+def adjacency_of(connections):
+    """Builds computer -> set of connected computers from the connections."""
+    adjacency = {}
     for a, b in connections:
-        computers.add(a)
-        computers.add(b)
+        adjacency.setdefault(a, set()).add(b)
+        adjacency.setdefault(b, set()).add(a)
+    return adjacency
+
 
-    count_with_t = 0
-    for combo in itertools.combinations(computers, 3):
-        a, b, c = sorted(combo)  # Sort for consistent checking
-        if (a, b) in connections and (a, c) in connections and (b, c) in connections:
-            if any(comp.startswith("t") for comp in (a, b, c)):
-                count_with_t += 1
-    return count_with_t
+def part1(connections):
+    """Finds sets of three interconnected computers and counts those with 't'."""
+    adjacency = adjacency_of(connections)
+    return sum(1 for _ in iter_k_cliques(adjacency, 3, lambda c: c.startswith("t")))
 
 
 def part2(connections):
     """Finds the largest set of interconnected computers and returns the password."""
-    computers = set()
-    for a, b in connections:
-        computers.add(a)
-        computers.add(b)
-
-    max_set = set()
-    for i in range(2, len(computers) + 1):  # Iterate through possible set sizes
-        for combo in itertools.combinations(computers, i):
-            is_connected = True
-            for pair in itertools.combinations(combo, 2):
-                if tuple(sorted(pair)) not in connections:
-                    is_connected = False
-                    break
-            if is_connected:
-                if len(combo) > len(max_set):
-                    max_set = set(combo)
+    max_set = maximum_clique(adjacency_of(connections))
 
     return ",".join(sorted(max_set))
 
@@ -1,5 +1,7 @@
 import itertools
 
+import numpy as np
+
 
 def read_data() -> dict[str, set[str]]:
     """
@@ -18,22 +20,392 @@ def part1(adjacency: dict[str, set[str]]) -> int:
     """
     Finds all triangles (3-cliques) in the graph and returns the number
     of triangles containing at least one computer name starting with 't'.
+    The 't' test is pushed into the enumeration (see iter_k_cliques()), so
+    only triangles through a 't' computer are ever built, each exactly once.
+    Dense graphs of two-letter names go to the matrix backend instead.
+    """
+    if use_dense_backend(adjacency):
+        return dense_triangle_count(adjacency_matrix(adjacency), first_letter("t"))
+    return sum(1 for _ in iter_k_cliques(adjacency, 3, lambda n: n.startswith("t")))
+
+
+# ----------------------------------------------------------------------
+# Dense 676 x 676 adjacency matrix backend
+# ----------------------------------------------------------------------
+
+N_NAMES = 26 * 26  # every two-lowercase-letter name
+DENSE_DENSITY = 0.2  # edge density from which the matrix backend wins
+
+
+def name_index(name: str) -> int:
+    """'aa' -> 0, 'ab' -> 1, ..., 'zz' -> 675."""
+    if len(name) != 2 or not ("a" <= name[0] <= "z" and "a" <= name[1] <= "z"):
+        raise ValueError(f"Not a two-letter lowercase name: {name!r}")
+    return (ord(name[0]) - 97) * 26 + ord(name[1]) - 97
+
+
+def first_letter(letter: str) -> np.ndarray:
+    """Boolean mask over the 676 name slots of the names starting with `letter`."""
+    mask = np.zeros(N_NAMES, dtype=bool)
+    start = name_index(letter + "a")
+    mask[start : start + 26] = True
+    return mask
+
+
+def adjacency_matrix(adjacency: dict[str, set[str]]) -> np.ndarray:
+    """The graph as a symmetric 676 x 676 uint8 0/1 matrix over name slots."""
+    matrix = np.zeros((N_NAMES, N_NAMES), dtype=np.uint8)
+    for a, neighbours in adjacency.items():
+        matrix[name_index(a), [name_index(b) for b in neighbours]] = 1
+    return matrix
+
+
+def _trace_cubed(matrix: np.ndarray) -> int:
+    """trace(A**3) as sum(A**2 * A): one product, done in float64 BLAS (exact)."""
+    a = matrix.astype(np.float64)
+    return int(round(((a @ a) * a).sum()))
+
+
+def dense_triangle_count(matrix: np.ndarray, restrict=None) -> int:
     """
-    triangles = set()
-    for u in adjacency:
-        for v in adjacency[u]:
-            if v <= u:
-                continue
-            # Intersection of neighbors of u and v are candidates to form triangles
-            common_neighbors = adjacency[u].intersection(adjacency[v])
-            for w in common_neighbors:
-                # Keep everything in a consistent sorted order to avoid duplicates
-                if w > v:
-                    triangles.add(frozenset([u, v, w]))
+    Number of triangles, trace(A**3) / 6. With a boolean node mask
+    `restrict`, only those with at least one node in the mask: all triangles
+    minus those of the rows/columns outside it.
+    """
+    total = _trace_cubed(matrix)
+    if restrict is not None:
+        outside = ~restrict
+        total -= _trace_cubed(matrix[np.ix_(outside, outside)])
+    return total // 6
+
+
+def use_dense_backend(adjacency: dict[str, set[str]]) -> bool:
+    """
+    True when every name fits a matrix slot and the edge density is at
+    least DENSE_DENSITY: the fixed-size matrix product then beats the
+    per-edge set intersections.
+    """
+    n = len(adjacency)
+    if n < 3 or n > N_NAMES:
+        return False
+    try:
+        for name in adjacency:
+            name_index(name)
+    except ValueError:
+        return False
+    edges = sum(len(neighbours) for neighbours in adjacency.values()) / 2
+    return edges / (n * (n - 1) / 2) >= DENSE_DENSITY
+
+
+# ----------------------------------------------------------------------
+# k-cliques touching a seed set
+# ----------------------------------------------------------------------
+
+
+def iter_k_cliques(adjacency: dict[str, set[str]], k: int, seed=None):
+    """
+    Yields every k-clique containing at least one node for which seed(node)
+    is true (every node if `seed` is None), exactly once, as a tuple whose
+    first node is a seed.
+
+    Seeds are taken one after the other and each clique is rooted at its
+    first seed in that order: a seed only looks at its neighbours minus the
+    seeds already done. The remaining k - 1 nodes are picked from that
+    candidate set in pop order, each pick narrowing it to the picked node's
+    neighbours that have not been popped yet, so no subset comes up twice.
+    The work is bounded by the neighbourhoods of the seeds, not the graph.
+    """
+    if k < 1:
+        raise ValueError("Clique size must be at least 1.")
+
+    def extend(clique: list[str], candidates: set[str]):
+        if len(clique) == k:
+            yield tuple(clique)
+            return
+        while len(clique) + len(candidates) >= k:
+            node = candidates.pop()
+            clique.append(node)
+            yield from extend(clique, candidates & adjacency[node])
+            clique.pop()
+
+    done: set[str] = set()
+    for node in adjacency:
+        if seed is None or seed(node):
+            candidates = adjacency[node] - done
+            done.add(node)
+            yield from extend([node], candidates)
+
+
+# ----------------------------------------------------------------------
+# Forward-ordered triangle enumeration
+# ----------------------------------------------------------------------
 
-    # Now filter for sets that have a node starting with 't'
-    count_with_t = sum(any(node.startswith("t") for node in tri) for tri in triangles)
-    return count_with_t
+
+def forward_neighbours(adjacency: dict[str, set[str]]) -> dict[str, set[str]]:
+    """
+    Orients every edge from the lower to the higher node in (degree, name)
+    order and returns node -> its out-neighbours. A node then has at most
+    O(sqrt(m)) out-neighbours: high-degree nodes point to few others.
+    """
+    order = sorted(adjacency, key=lambda node: (len(adjacency[node]), node))
+    rank = {node: i for i, node in enumerate(order)}
+    forward = {}
+    for node, neighbours in adjacency.items():
+        r = rank[node]
+        forward[node] = {other for other in neighbours if rank[other] > r}
+    return forward
+
+
+def iter_triangles(adjacency: dict[str, set[str]]):
+    """
+    Yields every triangle once, as a (u, v, w) tuple in increasing
+    (degree, name) order: u -> v, u -> w and v -> w are all forward edges, so
+    only forward lists are intersected, for O(m**1.5) work overall.
+    """
+    forward = forward_neighbours(adjacency)
+    for u, out in forward.items():
+        for v in out:
+            for w in out & forward[v]:
+                yield u, v, w
+
+
+def count_triangles(adjacency: dict[str, set[str]]) -> int:
+    """Number of triangles, as iter_triangles() without building any tuple."""
+    forward = forward_neighbours(adjacency)
+    return sum(len(out & forward[v]) for out in forward.values() for v in out)
+
+
+# ----------------------------------------------------------------------
+# Maximum clique: degeneracy ordering + pivoting + colouring bound
+# ----------------------------------------------------------------------
+
+
+def degeneracy_ordering(adjacency: dict[str, set[str]]) -> tuple[list[str], int]:
+    """
+    Returns (order, degeneracy): nodes in the order they are peeled off by
+    repeatedly removing a node of minimum remaining degree (bucket queue,
+    O(n + m)), and the largest degree seen at removal. Every node has at most
+    `degeneracy` neighbours later in the order.
+    """
+    degree = {node: len(neighbours) for node, neighbours in adjacency.items()}
+    buckets: list[set[str]] = [
+        set() for _ in range(max(degree.values(), default=0) + 1)
+    ]
+    for node, d in degree.items():
+        buckets[d].add(node)
+
+    order = []
+    d = 0
+    while len(order) < len(degree):
+        while not buckets[d]:
+            d += 1
+        node = buckets[d].pop()
+        order.append(node)
+        degree[node] = -1
+        for other in adjacency[node]:
+            k = degree[other]
+            # A neighbour already at level d will be peeled at this level
+            # anyway, so only higher ones move down and d never decreases
+            if k > d:
+                buckets[k].remove(other)
+                buckets[k - 1].add(other)
+                degree[other] = k - 1
+    return order, d
+
+
+def colour_bound(adjacency: dict[str, set[str]], candidates: set[str]) -> int:
+    """
+    Number of colours a greedy sequential colouring of `candidates` uses:
+    an upper bound on the size of any clique inside them.
+    """
+    classes: list[set[str]] = []
+    for node in candidates:
+        neighbours = adjacency[node]
+        for members in classes:
+            if neighbours.isdisjoint(members):
+                members.add(node)
+                break
+        else:
+            classes.append({node})
+    return len(classes)
+
+
+def maximum_clique(adjacency: dict[str, set[str]]) -> set[str]:
+    """
+    A largest set of pairwise connected nodes.
+
+    Nodes are taken in degeneracy order, and each one's clique search only
+    looks at its later neighbours (at most `degeneracy` of them), so every
+    clique is found from its first node exactly once. Inside, the search is
+    Bron-Kerbosch with Tomita pivoting (branch only on candidates that are
+    not neighbours of the candidate with the most neighbours in the set),
+    and a branch is cut as soon as the clique plus the greedy colour count
+    of its candidates cannot beat the best clique found so far.
+    """
+    order, _ = degeneracy_ordering(adjacency)
+    done: set[str] = set()
+    best: list[str] = []
+
+    def expand(clique: list[str], candidates: set[str]) -> None:
+        nonlocal best
+        if not candidates:
+            if len(clique) > len(best):
+                best = list(clique)
+            return
+        if len(clique) + colour_bound(adjacency, candidates) <= len(best):
+            return
+        pivot = max(candidates, key=lambda u: len(candidates & adjacency[u]))
+        for node in list(candidates - adjacency[pivot]):
+            clique.append(node)
+            expand(clique, candidates & adjacency[node])
+            clique.pop()
+            candidates.discard(node)
+            if len(clique) + len(candidates) <= len(best):
+                return
+
+    for node in order:
+        later = adjacency[node] - done
+        done.add(node)
+        if len(later) + 1 > len(best):
+            expand([node], later)
+    return set(best)
+
+
+# ----------------------------------------------------------------------
+# Interned bitset graph
+# ----------------------------------------------------------------------
+
+
+def iter_bits(mask: int):
+    """Indices of the set bits of `mask`, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitGraph:
+    """
+    The LAN graph with node names interned to dense ids.
+
+      - names: node names in sorted order; ids maps name -> position in it
+      - neighbours: neighbours[i] is the int bitset of the ids adjacent to i
+
+    As ids follow name order, the set bits of a mask read lowest first give
+    its names already sorted. Common neighbours are `&` of two ints and
+    sizes are bit_count(), so no string is hashed past construction.
+    """
+
+    def __init__(self, edges, nodes=()):
+        edges = list(edges)
+        self.names = sorted({name for edge in edges for name in edge}.union(nodes))
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.neighbours = [0] * len(self.names)
+        for a, b in edges:
+            i, j = self.ids[a], self.ids[b]
+            self.neighbours[i] |= 1 << j
+            self.neighbours[j] |= 1 << i
+
+    @classmethod
+    def from_adjacency(cls, adjacency: dict[str, set[str]]) -> "BitGraph":
+        edges = ((a, b) for a in adjacency for b in adjacency[a] if a < b)
+        return cls(edges, adjacency)
+
+    def __len__(self):
+        return len(self.names)
+
+    def mask(self, names) -> int:
+        """Bitset of the given node names."""
+        mask = 0
+        for name in names:
+            mask |= 1 << self.ids[name]
+        return mask
+
+    def decode(self, mask: int) -> list[str]:
+        """Node names of a bitset, in sorted order."""
+        return [self.names[i] for i in iter_bits(mask)]
+
+    def has_edge(self, a: str, b: str) -> bool:
+        return bool(self.neighbours[self.ids[a]] >> self.ids[b] & 1)
+
+    def common_neighbours(self, mask: int) -> int:
+        """Bitset of the nodes adjacent to every node of `mask`."""
+        common = (1 << len(self.names)) - 1
+        for i in iter_bits(mask):
+            common &= self.neighbours[i]
+        return common
+
+    def is_clique(self, mask: int) -> bool:
+        return all(mask & ~self.neighbours[i] == 1 << i for i in iter_bits(mask))
+
+    def triangle_count(self) -> int:
+        """Number of triangles: each is counted from its two lowest ids."""
+        total = 0
+        for i, row in enumerate(self.neighbours):
+            higher = row >> (i + 1) << (i + 1)
+            for j in iter_bits(higher):
+                total += ((row & self.neighbours[j]) >> (j + 1)).bit_count()
+        return total
+
+    def colour_bound(self, candidates: int) -> int:
+        """colour_bound() on a bitset: greedy colour classes, one at a time."""
+        colours = 0
+        while candidates:
+            colours += 1
+            free = candidates
+            while free:
+                low = free & -free
+                candidates ^= low
+                free &= ~low & ~self.neighbours[low.bit_length() - 1]
+        return colours
+
+    def maximum_clique(self) -> int:
+        """
+        maximum_clique() on bitsets: same degeneracy order, pivoting and
+        colouring bound, returning the clique as a mask.
+        """
+        order, _ = degeneracy_ordering(
+            {i: set(iter_bits(row)) for i, row in enumerate(self.neighbours)}
+        )
+        neighbours = self.neighbours
+        best = 0
+        best_size = 0
+
+        def expand(clique: int, size: int, candidates: int) -> None:
+            nonlocal best, best_size
+            if not candidates:
+                if size > best_size:
+                    best, best_size = clique, size
+                return
+            if size + self.colour_bound(candidates) <= best_size:
+                return
+            pivot = max(
+                iter_bits(candidates),
+                key=lambda u: (candidates & neighbours[u]).bit_count(),
+            )
+            for i in iter_bits(candidates & ~neighbours[pivot]):
+                expand(clique | 1 << i, size + 1, candidates & neighbours[i])
+                candidates &= ~(1 << i)
+                if size + candidates.bit_count() <= best_size:
+                    return
+
+        done = 0
+        for i in order:
+            later = neighbours[i] & ~done
+            done |= 1 << i
+            if later.bit_count() + 1 > best_size:
+                expand(1 << i, 1, later)
+        return best
+
+
+def part2(adjacency: dict[str, set[str]]) -> str:
+    """
+    The LAN party password: the names of the largest clique, sorted and
+    joined with commas. The search runs on the interned bitset graph, whose
+    masks decode to names in sorted order.
+    """
+    graph = BitGraph.from_adjacency(adjacency)
+    return ",".join(graph.decode(graph.maximum_clique()))
 
 
 import itertools
@@ -304,7 +676,7 @@ def generate_test_patterns(data, max_tests=50):
 def main():
     data = read_data()
     print(part1(data))
-    print(part2_bruteforce_incremental(data))
+    print(part2(data))
 
 
 if __name__ == "__main__":